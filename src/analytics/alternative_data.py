@@ -2,7 +2,7 @@ import numpy as np
 import pandas as pd
 from pytrends.request import TrendReq
 
-from src.analytics.forecasting import load_price_data
+from src.analytics.price_cache import load_ohlcv_df
 
 
 def fetch_google_trends(keyword: str, timeframe: str = "today 12-m", geo: str = "") -> pd.DataFrame:
@@ -47,7 +47,7 @@ def merge_trends_with_price(symbol: str, keyword: str, period: str = "1y", inter
       ds, price, trend
     """
     # Price data
-    price_df = load_price_data(symbol, period=period, interval=interval)
+    price_df = load_ohlcv_df(symbol, period=period, interval=interval)
     price_df = price_df.rename(columns={"y": "price"})
 
     # Trends data
@@ -67,6 +67,61 @@ def merge_trends_with_price(symbol: str, keyword: str, period: str = "1y", inter
     return merged
 
 
+def _lagged_corr(price: np.ndarray, trend: np.ndarray, max_lag: int) -> np.ndarray:
+    """
+    Pearson correlation of trend_t vs price_{t+lag} for lag in [-max_lag, max_lag].
+
+    The cross-products sum(trend_t * price_{t+lag}) for every lag come from a
+    single FFT cross-correlation, and the per-lag means / stds of the truncated
+    overlaps come from cumulative sums, so each lag is O(1) after the O(N log N)
+    setup and matches np.corrcoef on the same overlap. Overlaps shorter than 5
+    points are NaN.
+
+    Returns a float64 array of length 2 * max_lag + 1.
+    """
+    n = len(price)
+    lags = np.arange(-max_lag, max_lag + 1)
+    correlations = np.full(len(lags), np.nan)
+    if n == 0:
+        return correlations
+
+    # Correlation is shift-invariant; centering keeps the sums well conditioned
+    x = trend - trend.mean()
+    y = price - price.mean()
+
+    # Cross-products for every lag: c[k] = sum_t x_t * y_{t+k}
+    nfft = 1 << (2 * n - 1).bit_length()
+    cross = np.fft.irfft(np.fft.rfft(y, nfft) * np.conj(np.fft.rfft(x, nfft)), nfft)
+    sxy = cross[lags % nfft]
+
+    # Per-lag overlap windows: x[x_lo:x_hi] pairs with y[y_lo:y_hi]
+    m = n - np.abs(lags)
+    valid = m >= 5
+    x_lo = np.clip(-lags, 0, n)
+    y_lo = np.clip(lags, 0, n)
+    x_hi = np.clip(x_lo + m, 0, n)
+    y_hi = np.clip(y_lo + m, 0, n)
+
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(y)))
+    cxx = np.concatenate(([0.0], np.cumsum(x * x)))
+    cyy = np.concatenate(([0.0], np.cumsum(y * y)))
+
+    sx = cx[x_hi] - cx[x_lo]
+    sy = cy[y_hi] - cy[y_lo]
+    sxx = cxx[x_hi] - cxx[x_lo]
+    syy = cyy[y_hi] - cyy[y_lo]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mv = m[valid]
+        cov = sxy[valid] - sx[valid] * sy[valid] / mv
+        var_x = sxx[valid] - sx[valid] ** 2 / mv
+        var_y = syy[valid] - sy[valid] ** 2 / mv
+        correlations[valid] = cov / np.sqrt(var_x * var_y)
+
+    return correlations
+
+
 def compute_lagged_correlations(df: pd.DataFrame, max_lag: int = 30) -> pd.DataFrame:
     """
     Compute correlation between price and trend at different lags.
@@ -76,32 +131,12 @@ def compute_lagged_correlations(df: pd.DataFrame, max_lag: int = 30) -> pd.DataF
 
     Returns DataFrame with columns: lag, correlation
     """
-    correlations = []
-
-    price = df["price"].values.astype(float)
-    trend = df["trend"].values.astype(float)
-
-    for lag in range(-max_lag, max_lag + 1):
-        if lag < 0:
-            # trend_t vs price_{t+|lag|}
-            x = trend[-lag:]
-            y = price[: len(price) + lag]
-        elif lag > 0:
-            # trend_{t-lag} vs price_t
-            x = trend[:-lag]
-            y = price[lag:]
-        else:
-            x = trend
-            y = price
+    price = np.ascontiguousarray(df["price"].values, dtype=np.float64)
+    trend = np.ascontiguousarray(df["trend"].values, dtype=np.float64)
 
-        if len(x) < 5:
-            corr = np.nan
-        else:
-            corr = np.corrcoef(x, y)[0, 1]
+    correlations = _lagged_corr(price, trend, max_lag)
 
-        correlations.append({"lag": lag, "correlation": corr})
-
-    return pd.DataFrame(correlations)
+    return pd.DataFrame({"lag": np.arange(-max_lag, max_lag + 1), "correlation": correlations})
 
 def find_best_leading_lag(corr_df: pd.DataFrame) -> dict | None:
     """
@@ -109,13 +144,93 @@ def find_best_leading_lag(corr_df: pd.DataFrame) -> dict | None:
     (lag > 0, where trends lead price).
     Returns dict {'lag': int, 'correlation': float} or None if not found.
     """
-    leading = corr_df[corr_df["lag"] > 0].dropna(subset=["correlation"])
-    if leading.empty:
+    lags = corr_df["lag"].to_numpy()
+    corr = corr_df["correlation"].to_numpy(dtype=np.float64)
+
+    leading = (lags > 0) & np.isfinite(corr)
+    if not leading.any():
         return None
 
-    idx = leading["correlation"].abs().values.argmax()
-    row = leading.iloc[idx]
-    return {"lag": int(row["lag"]), "correlation": float(row["correlation"])}
+    idx = np.nanargmax(np.abs(np.where(leading, corr, np.nan)))
+    return {"lag": int(lags[idx]), "correlation": float(corr[idx])}
+
+def _rolling_mean_std(values: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Trailing rolling mean and sample std (ddof=1) over a 1D float array,
+    NaN for the first window - 1 points (same as pandas .rolling(window)).
+
+    Window sums come from cumulative-sum differences, so the cost is O(N)
+    regardless of window length.
+    """
+    mean = np.full(len(values), np.nan)
+    std = np.full(len(values), np.nan)
+    if window < 1 or len(values) < window:
+        return mean, std
+
+    # Shift-invariant: offsetting by a sample keeps the sum-of-squares well
+    # conditioned, and integer-valued series (Trends scores) stay exact, so a
+    # flat window still gets std == 0 rather than rounding noise
+    offset = values[0]
+    x = values - offset
+    csum = np.concatenate(([0.0], np.cumsum(x)))
+    s = csum[window:] - csum[:-window]
+    mean[window - 1:] = s / window + offset
+
+    if window > 1:
+        csum_sq = np.concatenate(([0.0], np.cumsum(x * x)))
+        s_sq = csum_sq[window:] - csum_sq[:-window]
+        # Guard against tiny negatives from float cancellation
+        var = np.maximum((s_sq - s * s / window) / (window - 1), 0.0)
+        std[window - 1:] = np.sqrt(var)
+    return mean, std
+
+
+def _bt_kernel(
+    price: np.ndarray,
+    trend: np.ndarray,
+    L: int,
+    roll_window: int,
+    z_threshold: float,
+):
+    """
+    Array core of backtest_trend_signal: signal, returns and equity curves in
+    one go, without materializing intermediate DataFrame columns.
+
+    Returns (keep, signal, strategy_ret, bh_ret, equity_strategy, equity_bh)
+    where `keep` masks the input rows that have an L-day forward return and
+    the remaining arrays are already restricted to those rows.
+    """
+    n = len(price)
+
+    # L-day forward return using price (so we compare on same horizon as the best lag)
+    future_ret = np.full(n, np.nan)
+    if 0 <= L < n:
+        future_ret[: n - L] = price[L:] / price[: n - L] - 1.0
+
+    # Rolling z-score and slope of the trend
+    trend_mean, trend_std = _rolling_mean_std(trend, roll_window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        trend_z = (trend - trend_mean) / trend_std
+    trend_slope = np.diff(trend, prepend=trend[:1])
+
+    # Simple long-only signal: 1 when trend is high & rising, else 0
+    signal = ((trend_z > z_threshold) & (trend_slope > 0)).astype(np.int8)
+
+    # Drop rows where we don't have future return yet
+    keep = ~np.isnan(future_ret)
+    signal = signal[keep]
+    bh_ret = future_ret[keep]
+
+    # Strategy return = signal * future L-day return; buy-and-hold always holds 1 unit
+    strategy_ret = signal * bh_ret
+
+    # Equity curves, compounded in log space: exp(cumsum(log1p(r))) == cumprod(1 + r)
+    with np.errstate(divide="ignore"):
+        equity_strategy = np.exp(np.cumsum(np.log1p(strategy_ret)))
+        equity_bh = np.exp(np.cumsum(np.log1p(bh_ret)))
+
+    return keep, signal, strategy_ret, bh_ret, equity_strategy, equity_bh
+
 
 def backtest_trend_signal(
     df: pd.DataFrame,
@@ -137,44 +252,29 @@ def backtest_trend_signal(
       bt_df: ds, signal, strategy_ret, bh_ret, equity_strategy, equity_bh
       metrics: dict with total returns & Sharpe-like ratio
     """
-    df = df.copy()
-
-    # L-day forward return using price (so we compare on same horizon as the best lag)
     L = best_lag
-    df["future_ret_L"] = df["price"].shift(-L) / df["price"] - 1.0
-
-    # Rolling stats on trends
-    df["trend_mean"] = df["trend"].rolling(roll_window).mean()
-    df["trend_std"] = df["trend"].rolling(roll_window).std()
-    df["trend_z"] = (df["trend"] - df["trend_mean"]) / df["trend_std"]
-    df["trend_slope"] = df["trend"].diff()
-
-    # Simple long-only signal: 1 when trend is high & rising, else 0
-    df["signal"] = 0
-    df.loc[
-        (df["trend_z"] > z_threshold) & (df["trend_slope"] > 0),
-        "signal",
-    ] = 1
-
-    # Drop rows where we don't have future return yet
-    bt_df = df.dropna(subset=["future_ret_L"]).copy()
-
-    # Strategy return = signal * future L-day return
-    bt_df["strategy_ret"] = bt_df["signal"] * bt_df["future_ret_L"]
-
-    # Buy-and-hold on same horizon (always 1 unit of risk)
-    bt_df["bh_ret"] = bt_df["future_ret_L"]
-
-    # Equity curves
-    bt_df["equity_strategy"] = (1 + bt_df["strategy_ret"]).cumprod()
-    bt_df["equity_bh"] = (1 + bt_df["bh_ret"]).cumprod()
+    price = df["price"].to_numpy(dtype=np.float64)
+    trend = df["trend"].to_numpy(dtype=np.float64)
+
+    keep, signal, strategy_ret, bh_ret, equity_strategy, equity_bh = _bt_kernel(
+        price, trend, L, roll_window, z_threshold
+    )
+
+    bt_df = pd.DataFrame({
+        "ds": df["ds"].to_numpy()[keep],
+        "signal": signal,
+        "strategy_ret": strategy_ret,
+        "bh_ret": bh_ret,
+        "equity_strategy": equity_strategy,
+        "equity_bh": equity_bh,
+    })
 
     # Metrics
-    total_strategy = bt_df["equity_strategy"].iloc[-1] - 1.0
-    total_bh = bt_df["equity_bh"].iloc[-1] - 1.0
+    total_strategy = equity_strategy[-1] - 1.0
+    total_bh = equity_bh[-1] - 1.0
 
-    avg = bt_df["strategy_ret"].mean()
-    std = bt_df["strategy_ret"].std()
+    avg = strategy_ret.mean()
+    std = strategy_ret.std(ddof=1) if len(strategy_ret) > 1 else np.nan
     if std > 0:
         # Very rough Sharpe approximation (scale by sqrt of 252/L)
         sharpe = avg / std * np.sqrt(252.0 / L)
@@ -185,9 +285,9 @@ def backtest_trend_signal(
         "total_return_strategy": total_strategy,
         "total_return_bh": total_bh,
         "sharpe_like": sharpe,
-        "n_trades_periods": int(bt_df["signal"].sum()),
+        "n_trades_periods": int(signal.sum()),
         "lag_used": int(L),
     }
 
-    return bt_df[["ds", "signal", "strategy_ret", "bh_ret", "equity_strategy", "equity_bh"]], metrics
+    return bt_df, metrics
 
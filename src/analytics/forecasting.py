@@ -1,6 +1,13 @@
+import hashlib
+import os
+from collections import OrderedDict
+from datetime import date
+from pathlib import Path
+
 import pandas as pd
 import yfinance as yf
 from prophet import Prophet
+from prophet.serialize import model_from_json, model_to_json
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 import numpy as np
 import torch
@@ -12,6 +19,20 @@ YF_SYMBOL_MAP = {
     # you can add more mappings here if needed
 }
 
+# Fitted Prophet models + forecasts, keyed by "<data hash>_<periods>".
+# Kept in memory for reruns (LRU, MODEL_CACHE_SIZE entries) and on disk, for
+# the current day only, so a cold start can skip the fit too.
+PROPHET_CACHE_DIR = Path.home() / ".cache" / "trading-lab" / "prophet"
+MODEL_CACHE_SIZE = 16
+_prophet_cache: OrderedDict[str, tuple[pd.DataFrame, Prophet]] = OrderedDict()
+
+# Fitted NeuralProphet models, keyed by data hash (the horizon only affects
+# predict); LRU, MODEL_CACHE_SIZE entries
+_neuralprophet_cache: OrderedDict[str, object] = OrderedDict()
+
+# Downloaded price frames, keyed by (symbol, period, interval, day)
+_price_cache: dict[tuple, pd.DataFrame] = {}
+
 
 def map_to_yf_symbol(symbol: str) -> str:
     """
@@ -30,7 +51,15 @@ def load_price_data(symbol: str, period: str = "1y", interval: str = "1d") -> pd
       - ds: datetime
       - y: numeric close price
     Handles both normal and MultiIndex columns from yfinance.
+
+    Results are cached in-process per (symbol, period, interval) for the
+    current day, so repeated calls skip the yfinance round-trip.
     """
+    cache_key = (symbol, period, interval, date.today())
+    cached = _price_cache.get(cache_key)
+    if cached is not None:
+        return cached.copy()
+
     yf_symbol = map_to_yf_symbol(symbol)
 
     raw = yf.download(yf_symbol, period=period, interval=interval)
@@ -93,21 +122,123 @@ def load_price_data(symbol: str, period: str = "1y", interval: str = "1d") -> pd
             f"Columns were: {raw.columns.tolist()}"
         )
 
-    return df
+    # Drop entries from previous days before caching today's frame
+    for key in [k for k in _price_cache if k[3] != cache_key[3]]:
+        del _price_cache[key]
+    _price_cache[cache_key] = df
+
+    return df.copy()
 # ------------------------------
 # 2. PROPHET FORECASTING
 # ------------------------------
+def _data_hash(df: pd.DataFrame) -> str:
+    return hashlib.blake2b(
+        pd.util.hash_pandas_object(df[["ds", "y"]], index=False).to_numpy().tobytes(),
+        digest_size=16,
+    ).hexdigest()
+
+
+def _lru_get(cache: OrderedDict, key):
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _lru_put(cache: OrderedDict, key, value) -> None:
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > MODEL_CACHE_SIZE:
+        cache.popitem(last=False)
+
+
 def train_prophet(df: pd.DataFrame, periods: int = 30) -> tuple[pd.DataFrame, Prophet]:
     """
     Train a Prophet model and return forecast + model.
+
+    Fits are cached by a hash of the (ds, y) data plus `periods`: first in
+    memory, then under PROPHET_CACHE_DIR, so identical requests skip the fit.
+    """
+    cache_key = f"{_data_hash(df)}_{periods}"
+
+    cached = _lru_get(_prophet_cache, cache_key)
+    if cached is not None:
+        forecast, model = cached
+        return forecast.copy(), model
+
+    day = f"{date.today():%Y%m%d}"
+    model_path = PROPHET_CACHE_DIR / f"{day}_{cache_key}.json"
+    forecast_path = PROPHET_CACHE_DIR / f"{day}_{cache_key}.pkl"
+
+    try:
+        model = model_from_json(model_path.read_text())
+        forecast = pd.read_pickle(forecast_path)
+    except Exception:
+        # Missing, partially written, or from an incompatible prophet /
+        # pandas version (UnpicklingError, AttributeError, ...): refit
+        model = Prophet()
+        model.fit(df)
+
+        future = model.make_future_dataframe(periods=periods)
+        forecast = model.predict(future)
+
+        try:
+            PROPHET_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            # Drop files from previous days before writing today's
+            for old in PROPHET_CACHE_DIR.iterdir():
+                if not old.name.startswith(day):
+                    old.unlink(missing_ok=True)
+            # Write-then-rename so a crash never leaves a half-written entry
+            tmp_model, tmp_forecast = model_path.with_suffix(".json.tmp"), forecast_path.with_suffix(".pkl.tmp")
+            tmp_model.write_text(model_to_json(model))
+            forecast.to_pickle(tmp_forecast)
+            tmp_model.replace(model_path)
+            tmp_forecast.replace(forecast_path)
+        except OSError:
+            pass  # read-only or full disk: keep the in-memory cache only
+
+    _lru_put(_prophet_cache, cache_key, (forecast, model))
+    return forecast.copy(), model
+
+
+def fit_neuralprophet(df: pd.DataFrame):
     """
-    model = Prophet()
-    model.fit(df)
+    Fit a NeuralProphet model on (ds, y). Fits are cached in memory by a hash
+    of the data only, so changing the horizon never refits.
 
-    future = model.make_future_dataframe(periods=periods)
+    neuralprophet is an optional dependency, imported on first use.
+    """
+    data_hash = _data_hash(df)
+    cached = _lru_get(_neuralprophet_cache, data_hash)
+    if cached is not None:
+        return cached
+
+    from neuralprophet import NeuralProphet
+
+    model = NeuralProphet()
+    model.fit(df[["ds", "y"]], freq="D", progress=None)
+
+    _lru_put(_neuralprophet_cache, data_hash, model)
+    return model
+
+
+def neuralprophet_forecast(model, df: pd.DataFrame, periods: int = 30) -> pd.DataFrame:
+    """
+    Predict history + `periods` future days with an already fitted NeuralProphet
+    model. Returns ds, yhat (same columns evaluate_forecast / the charts use).
+    """
+    future = model.make_future_dataframe(df[["ds", "y"]], periods=periods, n_historic_predictions=True)
     forecast = model.predict(future)
+    return pd.DataFrame({"ds": forecast["ds"], "yhat": forecast["yhat1"]})
+
 
-    return forecast, model
+def train_neuralprophet(df: pd.DataFrame, periods: int = 30):
+    """
+    NeuralProphet counterpart of train_prophet: returns forecast + model, with
+    the (expensive) fit cached and the (cheap) predict run per call.
+    """
+    model = fit_neuralprophet(df)
+    return neuralprophet_forecast(model, df, periods=periods), model
 
 
 def evaluate_forecast(df: pd.DataFrame, forecast: pd.DataFrame) -> dict:
@@ -159,11 +290,25 @@ def _create_lstm_sequences(values: np.ndarray, window_size: int):
       X: (num_samples, window_size)
       y: (num_samples,)
     """
-    X, y = [], []
-    for i in range(len(values) - window_size):
-        X.append(values[i : i + window_size])
-        y.append(values[i + window_size])
-    return np.array(X, dtype="float32"), np.array(y, dtype="float32")
+    if len(values) <= window_size:
+        return np.empty((0, window_size), dtype="float32"), np.empty(0, dtype="float32")
+
+    # Strided view over the series (no copy); the last window has no target
+    X = np.lib.stride_tricks.sliding_window_view(values, window_size)[:-1]
+    y = values[window_size:]
+    return np.ascontiguousarray(X, dtype="float32"), np.ascontiguousarray(y, dtype="float32")
+
+
+def _to_device(values: np.ndarray, device: str) -> torch.Tensor:
+    """
+    Move a NumPy array to `device`. CUDA copies are staged through pinned
+    host memory so the transfer is a single async DMA; on CPU the tensor
+    shares memory with `values`.
+    """
+    t = torch.from_numpy(np.ascontiguousarray(values))
+    if torch.device(device).type == "cuda":
+        return t.pin_memory().to(device, non_blocking=True)
+    return t.to(device)
 
 
 def train_lstm_forecast(
@@ -173,12 +318,16 @@ def train_lstm_forecast(
     lr: float = 1e-3,
     forecast_horizon: int = 30,
     device: str | None = None,
+    batch_size: int = 256,
 ):
     """
     Train an LSTM on the 'y' series in df and:
       - return in-sample predictions (aligned to history)
       - return future predictions for `forecast_horizon` days
 
+    Training runs in shuffled mini-batches of `batch_size` sequences; on CUDA
+    the forward pass and loss run under bf16 autocast (weights stay fp32).
+
     Returns:
       in_sample_df: ds, yhat_lstm (aligned to df[window_size:])
       future_df:    ds, yhat_lstm (next forecast_horizon days)
@@ -187,6 +336,12 @@ def train_lstm_forecast(
     if device is None:
         device = "cuda" if torch.cuda.is_available() else "cpu"
 
+    device_type = torch.device(device).type
+    use_amp = device_type == "cuda" and torch.cuda.is_bf16_supported()
+    if device_type == "cuda":
+        # Fixed (seq_len, hidden) shapes: let cuDNN pick the fastest LSTM kernels
+        torch.backends.cudnn.benchmark = True
+
     series = df["y"].values.astype("float32")
 
     # Normalize for stable training
@@ -204,28 +359,82 @@ def train_lstm_forecast(
     X_train = X[:cutoff]
     y_train = y[:cutoff]
 
-    X_train_t = torch.from_numpy(X_train).unsqueeze(-1).to(device)  # (batch, seq_len, 1)
-    y_train_t = torch.from_numpy(y_train).unsqueeze(-1).to(device)  # (batch, 1)
+    X_train_t = _to_device(X_train, device).unsqueeze(-1)  # (batch, seq_len, 1)
+    y_train_t = _to_device(y_train, device).unsqueeze(-1)  # (batch, 1)
 
     model = LSTMForecast(input_size=1, hidden_size=32, num_layers=2, dropout=0.2).to(device)
     criterion = nn.MSELoss()
     optimizer = torch.optim.Adam(model.parameters(), lr=lr)
 
+    n_train = X_train_t.shape[0]
+
     model.train()
     for epoch in range(epochs):
-        optimizer.zero_grad()
-        out = model(X_train_t)
-        loss = criterion(out, y_train_t)
-        loss.backward()
-        optimizer.step()
-
-    # In-sample predictions for all sequences (including the last ones)
+        perm = torch.randperm(n_train, device=device)
+        for start in range(0, n_train, batch_size):
+            idx = perm[start : start + batch_size]
+
+            optimizer.zero_grad()
+            with torch.autocast(device_type=device_type, dtype=torch.bfloat16, enabled=use_amp):
+                out = model(X_train_t[idx])
+                loss = criterion(out.float(), y_train_t[idx])
+            loss.backward()
+            optimizer.step()
+
+    # Inference runs through a TorchScript copy of the trained model: it removes
+    # the Python dispatch per call, which matters in the step-by-step loop below
     model.eval()
+    infer_model = torch.jit.script(model)
+
+    # Future forecasts: iterative one-step ahead.
+    # The rolling window and the outputs stay on the device, so a step is just the
+    # model call plus an in-place shift; results come back to the host once.
+    last_date = df["ds"].iloc[-1]
+
+    win = _to_device(series_norm[-window_size:].copy(), device).view(1, window_size, 1)
+    out = torch.empty(forecast_horizon, device=device)
+
+    def _step():
+        next_norm = infer_model(win).reshape(())
+        # roll window and append prediction
+        win[0, :-1, 0] = win[0, 1:, 0].clone()
+        win[0, -1, 0] = next_norm
+        return next_norm
+
     with torch.no_grad():
-        X_all_t = torch.from_numpy(X).unsqueeze(-1).to(device)
-        preds_norm = model(X_all_t).cpu().numpy().flatten()
+        # In-sample predictions for all sequences (including the last ones)
+        X_all_t = _to_device(X, device).unsqueeze(-1)
+        preds_norm = infer_model(X_all_t).cpu().numpy().flatten()
+
+        graph = None
+        if win.is_cuda and forecast_horizon > 0:
+            # Capture one step as a CUDA graph so each horizon step is a single replay
+            start_win = win.clone()
+            try:
+                side = torch.cuda.Stream()
+                side.wait_stream(torch.cuda.current_stream())
+                with torch.cuda.stream(side):
+                    for _ in range(3):  # warm-up before capture
+                        _step()
+                torch.cuda.current_stream().wait_stream(side)
+                win.copy_(start_win)
+
+                graph = torch.cuda.CUDAGraph()
+                with torch.cuda.graph(graph):
+                    step_out = _step()
+            except RuntimeError:
+                graph = None
+            win.copy_(start_win)
+
+        for i in range(forecast_horizon):
+            if graph is not None:
+                graph.replay()
+                out[i] = step_out
+            else:
+                out[i] = _step()
 
     preds = preds_norm * std + mean
+    future_preds = out.cpu().numpy() * std + mean
 
     # Align predictions to df dates
     ds_all = df["ds"].iloc[window_size:]
@@ -237,27 +446,37 @@ def train_lstm_forecast(
     rmse = np.sqrt(mean_squared_error(merged["y"], merged["yhat_lstm"]))
     metrics = {"MAE": mae, "RMSE": rmse}
 
-    # Future forecasts: iterative one-step ahead
-    future_dates = []
-    future_preds = []
+    future_dates = pd.date_range(last_date + pd.Timedelta(days=1), periods=forecast_horizon, freq="D")
 
-    last_window = series_norm[-window_size:].copy()
-    last_date = df["ds"].iloc[-1]
-
-    for i in range(forecast_horizon):
-        x_in = torch.from_numpy(last_window).view(1, window_size, 1).to(device)
-        with torch.no_grad():
-            next_norm = model(x_in).cpu().numpy().flatten()[0]
+    future_df = pd.DataFrame({"ds": future_dates, "yhat_lstm": future_preds})
 
-        next_value = next_norm * std + mean
-        future_preds.append(next_value)
+    return in_sample_df, future_df, metrics
 
-        # roll window and append prediction
-        last_window = np.roll(last_window, -1)
-        last_window[-1] = next_norm
 
-        future_dates.append(last_date + pd.Timedelta(days=i + 1))
+def prophet_forecast_job(df: pd.DataFrame, periods: int = 30) -> pd.DataFrame:
+    """
+    Process-pool entry point for train_prophet: returns only the forecast, so
+    the fitted model never has to be pickled back to the caller.
+    """
+    forecast, _ = train_prophet(df, periods=periods)
+    return forecast
 
-    future_df = pd.DataFrame({"ds": future_dates, "yhat_lstm": future_preds})
 
-    return in_sample_df, future_df, metrics
+def lstm_forecast_job(
+    df: pd.DataFrame,
+    window_size: int = 30,
+    epochs: int = 30,
+    forecast_horizon: int = 30,
+):
+    """
+    Process-pool entry point for train_lstm_forecast. Caps torch's intra-op
+    threads at half the cores so it doesn't oversubscribe the CPU while a
+    Prophet fit runs next to it.
+    """
+    torch.set_num_threads(max(1, (os.cpu_count() or 2) // 2))
+    return train_lstm_forecast(
+        df,
+        window_size=window_size,
+        epochs=epochs,
+        forecast_horizon=forecast_horizon,
+    )
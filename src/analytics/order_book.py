@@ -1,32 +1,65 @@
+import queue
 import time
 from datetime import datetime
+import numpy as np
 import pandas as pd
 import streamlit as st
 import plotly.express as px
-from src.data_pipeline.binance_client import get_order_book_df
+from src.data_pipeline.binance_client import (
+    ORDER_BOOK_STREAM_LEVELS,
+    get_order_book_df,
+    order_book_to_df,
+    start_order_book_stream,
+)
+
+
+def _imbalance(bid_vol: float, ask_vol: float) -> float:
+    if bid_vol + ask_vol == 0:
+        return 0.0
+
+    return (bid_vol - ask_vol) / (bid_vol + ask_vol)
 
 
 def compute_liquidity_imbalance(df: pd.DataFrame) -> float:
     """
     Liquidity imbalance = (BidVolume - AskVolume) / (BidVolume + AskVolume)
     """
-    bid_vol = df[df["side"] == "bid"]["volume"].sum()
-    ask_vol = df[df["side"] == "ask"]["volume"].sum()
+    vol = df["volume"].to_numpy(dtype=np.float64)
+    is_bid = df["side"].to_numpy() == "bid"
 
-    if bid_vol + ask_vol == 0:
-        return 0.0
+    # Every level is either a bid or an ask, so one mask covers both sides
+    bid_vol = vol[is_bid].sum()
+    ask_vol = vol.sum() - bid_vol
+
+    return _imbalance(bid_vol, ask_vol)
 
-    return (bid_vol - ask_vol) / (bid_vol + ask_vol)
 
+def compute_book_imbalance(bids: dict, asks: dict) -> float:
+    """
+    Same as compute_liquidity_imbalance, straight from price -> qty dicts
+    (as produced by the order book stream).
+    """
+    return _imbalance(sum(bids.values()), sum(asks.values()))
 
-def draw_order_book(symbol: str, container_metrics, container_depth, container_heat):
-    df = get_order_book_df(symbol=symbol, limit=80)
+
+def draw_order_book(symbol: str, container_metrics, container_depth, container_heat, book: dict | None = None):
+    """
+    Draw metrics, depth chart and heatmap for one order book.
+    `book` is a streamed {"bids": {price: qty}, "asks": {price: qty}}; if not
+    given, a REST snapshot of the same depth as the stream is fetched, so the
+    first frame and the streamed ones are comparable.
+    """
+    if book is None:
+        df = get_order_book_df(symbol=symbol, limit=ORDER_BOOK_STREAM_LEVELS)
+        imbalance = compute_liquidity_imbalance(df)
+    else:
+        df = order_book_to_df(list(book["bids"].items()), list(book["asks"].items()))
+        imbalance = compute_book_imbalance(book["bids"], book["asks"])
 
     # --- Spread & imbalance ---
     best_bid = df[df["side"] == "bid"]["price"].max()
     best_ask = df[df["side"] == "ask"]["price"].min()
     spread = best_ask - best_bid
-    imbalance = compute_liquidity_imbalance(df)
     last_updated = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
 
     with container_metrics:
@@ -62,6 +95,7 @@ def draw_order_book(symbol: str, container_metrics, container_depth, container_h
             index="price",
             columns="side",
             fill_value=0,
+            observed=True,
         ).sort_index(ascending=False)
 
         fig_heat = px.imshow(
@@ -78,7 +112,8 @@ def render_order_book_section(symbol: str):
 
     st.markdown(
         "This view pulls the **live Binance order book** for the selected symbol "
-        "and visualizes depth, spread, and liquidity imbalance."
+        "and visualizes depth, spread, and liquidity imbalance. "
+        "Auto-refresh follows the top-20 levels over Binance's WebSocket depth stream."
     )
 
     auto_refresh = st.checkbox("Auto-refresh", value=True)
@@ -94,10 +129,30 @@ def render_order_book_section(symbol: str):
     draw_order_book(symbol, metrics_placeholder, depth_placeholder, heat_placeholder)
 
     if auto_refresh:
-        # Simple loop – runs for `cycles` iterations, then stops
-        for i in range(cycles):
-            time.sleep(refresh_rate)
-            draw_order_book(symbol, metrics_placeholder, depth_placeholder, heat_placeholder)
-            # A small visual cue in the UI
-            st.caption(f"Auto-refresh {i + 1}/{cycles}")
+        # Runs for `cycles` iterations, then stops. Books arrive over the
+        # WebSocket stream; we only redraw when a new one came in.
+        updates, stop = start_order_book_stream(symbol)
+        try:
+            for i in range(cycles):
+                time.sleep(refresh_rate)
+
+                # Drain to the most recent book
+                book = None
+                while True:
+                    try:
+                        book = updates.get_nowait()
+                    except queue.Empty:
+                        break
+
+                if isinstance(book, Exception):
+                    st.error(f"Order book stream failed: {book}")
+                    break
+                if book is None:
+                    continue
+
+                draw_order_book(symbol, metrics_placeholder, depth_placeholder, heat_placeholder, book=book)
+                # A small visual cue in the UI
+                st.caption(f"Auto-refresh {i + 1}/{cycles}")
+        finally:
+            stop.set()
 
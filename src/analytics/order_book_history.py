@@ -1,55 +1,164 @@
+from collections.abc import Mapping
+
 import pandas as pd
 from sqlalchemy import text
 from src.data_pipeline.database import get_engine
 
 
-def load_order_book_history(symbol: str, start_time: str, end_time: str) -> pd.DataFrame:
+_OB_HISTORY_SQL = text("""
+    SELECT symbol, snapshot_time, side, price, volume
+    FROM order_book_snapshots
+    WHERE symbol = :symbol
+    AND snapshot_time BETWEEN :start_time AND :end_time
+    ORDER BY snapshot_time ASC, price ASC;
+""")
+
+# Same window, binned into :buckets equal-width price buckets per snapshot.
+# Each snapshot's edges are centred on its own mid (best bid + best ask) / 2
+# and :buckets is even, so the mid is always a bucket edge: bids and asks
+# never share a bucket and the spread survives however far price moves over
+# the window.
+_OB_HISTORY_BUCKETED_SQL = text("""
+    WITH window_rows AS (
+        SELECT snapshot_time, side, price, volume
+        FROM order_book_snapshots
+        WHERE symbol = :symbol
+        AND snapshot_time BETWEEN :start_time AND :end_time
+    ),
+    touch AS (
+        SELECT
+            snapshot_time,
+            MAX(price) FILTER (WHERE side = 'bid') AS best_bid,
+            MIN(price) FILTER (WHERE side = 'ask') AS best_ask,
+            MIN(price) AS pmin,
+            MAX(price) AS pmax
+        FROM window_rows
+        GROUP BY snapshot_time
+    ),
+    mids AS (
+        SELECT
+            snapshot_time,
+            pmin,
+            pmax,
+            (COALESCE(best_bid, best_ask) + COALESCE(best_ask, best_bid)) / 2 AS mid
+        FROM touch
+    ),
+    edges AS (
+        SELECT
+            snapshot_time,
+            mid - GREATEST(mid - pmin, pmax - mid) AS lo,
+            mid + GREATEST(mid - pmin, pmax - mid) AS hi
+        FROM mids
+    ),
+    bucketed AS (
+        SELECT
+            w.snapshot_time,
+            w.side,
+            w.volume,
+            e.lo,
+            e.hi,
+            CASE
+                WHEN e.hi > e.lo
+                THEN LEAST(width_bucket(w.price, e.lo, e.hi, :buckets), :buckets)
+                ELSE 1
+            END AS pb
+        FROM window_rows w
+        JOIN edges e USING (snapshot_time)
+    )
+    SELECT
+        CAST(:symbol AS TEXT) AS symbol,
+        snapshot_time,
+        side,
+        lo + (pb - 0.5) * (hi - lo) / :buckets AS price,
+        SUM(volume) AS volume
+    FROM bucketed
+    GROUP BY snapshot_time, side, pb, lo, hi
+    ORDER BY snapshot_time ASC, price ASC;
+""")
+
+
+def load_order_book_history(
+    symbol: str,
+    start_time: str,
+    end_time: str,
+    price_buckets: int | None = 200,
+) -> pd.DataFrame:
     """
     Load historical order book snapshots from PostgreSQL.
     start_time / end_time should be ISO timestamps or 'YYYY-MM-DD HH:MM:SS' strings.
 
+    By default prices are binned server-side into `price_buckets` equal-width
+    buckets (rounded up to an even number) spanning each snapshot's own book,
+    centred on its mid, and volumes are summed per (snapshot_time, side,
+    bucket), so only the aggregated matrix crosses the wire; `price` is then
+    the bucket midpoint. Bids and asks always land in separate buckets. Pass
+    price_buckets=None to get the raw price levels.
+
     Returns a DataFrame:
       symbol | snapshot_time | side | price | volume
     """
-    query = text("""
-        SELECT symbol, snapshot_time, side, price, volume
-        FROM order_book_snapshots
-        WHERE symbol = :symbol
-        AND snapshot_time BETWEEN :start_time AND :end_time
-        ORDER BY snapshot_time ASC, price ASC;
-    """)
-
-    engine = get_engine()
-    df = pd.read_sql(query, engine, params={
+    params = {
         "symbol": symbol,
         "start_time": start_time,
-        "end_time": end_time
-    })
+        "end_time": end_time,
+    }
+
+    if price_buckets is None:
+        query = _OB_HISTORY_SQL
+    else:
+        query = _OB_HISTORY_BUCKETED_SQL
+        # Even, so each snapshot's mid falls on a bucket edge
+        params["buckets"] = price_buckets + price_buckets % 2
+
+    engine = get_engine()
+    df = pd.read_sql(query, engine, params=params)
 
     return df
 
-def build_heatmap_frames(df: pd.DataFrame):
+
+class HeatmapFrames(Mapping):
+    """
+    Read-only {timestamp: heatmap_df} mapping over one wide
+    (snapshot_time, price) × side volume frame.
+
+    Each heatmap DataFrame is only sliced out (via .xs) when its timestamp is
+    looked up, so replay pays per-frame cost for frames it shows.
     """
-    Convert snapshot rows into a dict of:
+
+    def __init__(self, wide: pd.DataFrame):
+        self._wide = wide
+        self._timestamps = wide.index.get_level_values("snapshot_time").unique()
+
+    def __getitem__(self, ts) -> pd.DataFrame:
+        # Heatmaps show highest price first
+        return self._wide.xs(ts, level="snapshot_time").sort_index(ascending=False)
+
+    def __iter__(self):
+        return iter(self._timestamps)
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+
+def build_heatmap_frames(df: pd.DataFrame) -> HeatmapFrames:
+    """
+    Convert snapshot rows into a mapping of:
     {
         timestamp1: pivot_table_df,
         timestamp2: pivot_table_df,
         ...
     }
 
-    Each pivot table is price × side → volume.
+    Each pivot table is price × side → volume (mean volume for duplicate
+    levels, 0 where a side has no volume at that price).
     """
-    frames = {}
-
-    for ts, group in df.groupby("snapshot_time"):
-        heat_df = group.pivot_table(
-            values="volume",
-            index="price",
-            columns="side",
-            fill_value=0
-        ).sort_index(ascending=False)
-
-        frames[ts] = heat_df
-
-    return frames
+    # One pivot over all snapshots instead of one pivot_table per snapshot
+    wide = (
+        df.astype({"volume": "float64"})
+        .groupby(["snapshot_time", "price", "side"])["volume"]
+        .mean()
+        .unstack("side", fill_value=0)
+        .sort_index()
+    )
 
+    return HeatmapFrames(wide)
@@ -0,0 +1,64 @@
+import os
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from src.analytics.forecasting import load_price_data
+
+# Daily (ds, y) price frames as Arrow IPC files, one per (symbol, period,
+# interval, day). Shared by every lab, and kept across app restarts.
+OHLCV_CACHE_DIR = Path.home() / ".cache" / "trading-lab" / "ohlcv"
+
+
+def _cache_path(symbol: str, period: str, interval: str) -> Path:
+    return OHLCV_CACHE_DIR / f"{symbol}_{period}_{interval}_{date.today():%Y%m%d}.arrow"
+
+
+def get_ohlcv(symbol: str, period: str = "1y", interval: str = "1d") -> pa.Table:
+    """
+    Price data (ds, y) for symbol/period/interval as an Arrow table.
+
+    Lookup order: today's IPC file under OHLCV_CACHE_DIR (memory-mapped, no
+    parse), then load_price_data. Fresh downloads are written back so the
+    next section / restart reads them from disk.
+    """
+    path = _cache_path(symbol, period, interval)
+
+    try:
+        with pa.memory_map(str(path)) as source:
+            return pa.ipc.open_file(source).read_all()
+    except (OSError, pa.ArrowInvalid):
+        pass
+
+    table = pa.Table.from_pandas(load_price_data(symbol, period=period, interval=interval), preserve_index=False)
+
+    try:
+        OHLCV_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Drop files from previous days for this key before writing today's
+        for old in OHLCV_CACHE_DIR.glob(f"{symbol}_{period}_{interval}_*.arrow"):
+            old.unlink(missing_ok=True)
+        # Unique temp name: concurrent sessions may miss the same key at once
+        fd, tmp_name = tempfile.mkstemp(dir=OHLCV_CACHE_DIR, prefix=path.stem, suffix=".tmp")
+        os.close(fd)
+        tmp_path = Path(tmp_name)
+        try:
+            with pa.OSFile(tmp_name, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            tmp_path.replace(path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    except OSError:
+        pass  # read-only or full disk: serve from memory only
+
+    return table
+
+
+def load_ohlcv_df(symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
+    """
+    Same as get_ohlcv, as a pandas DataFrame with columns ['ds', 'y'].
+    """
+    return get_ohlcv(symbol, period=period, interval=interval).to_pandas()
@@ -1,52 +1,36 @@
+from datetime import datetime, timedelta, timezone
+
 import pandas as pd
-from sqlalchemy import text
 
-from src.data_pipeline.database import get_engine
+from src.config import DEBUG
+from src.data_pipeline.database import fetch_klines_df
+
+# Lookbacks longer than this are downsampled before leaving the database
+DOWNSAMPLE_AFTER_MINUTES = 24 * 60
+
 
 def load_recent_klines_from_db(
     symbol: str,
     interval: str = "1m",
-    lookback_minutes: int = 60,  # kept for signature compatibility; not used
+    lookback_minutes: int = 60,
+    bucket_seconds: int = 300,
 ) -> pd.DataFrame:
     """
-    Load recent OHLCV data from price_klines for a given symbol/interval.
-    DEBUG VERSION: ignore time filter and just fetch the last 500 rows.
-    """
-    engine = get_engine()
+    Load OHLCV data from price_klines for a given symbol/interval covering the
+    last `lookback_minutes`, oldest -> newest.
 
-    sql = text(
-        """
-        SELECT
-            open_time,
-            close_time,
-            open,
-            high,
-            low,
-            close,
-            volume,
-            quote_asset_volume,
-            number_of_trades,
-            taker_buy_base,
-            taker_buy_quote
-        FROM price_klines
-        WHERE symbol = :symbol
-          AND interval = :interval
-        ORDER BY open_time DESC
-        LIMIT 500;
-        """
+    The time filter runs in Postgres. For lookbacks longer than a day the rows
+    are also aggregated into `bucket_seconds` candles server-side, so only the
+    downsampled series goes over the wire.
+    """
+    since = datetime.now(timezone.utc) - timedelta(minutes=lookback_minutes)
+    df = fetch_klines_df(
+        symbol,
+        interval,
+        since,
+        bucket_seconds=bucket_seconds if lookback_minutes > DOWNSAMPLE_AFTER_MINUTES else None,
     )
 
-    with engine.connect() as conn:
-        df = pd.read_sql(
-            sql,
-            conn,
-            params={
-                "symbol": symbol,
-                "interval": interval,
-            },
-        )
-
-    # sort oldest → newest for plotting
-    df = df.sort_values("open_time").reset_index(drop=True)
-    print(f"[DEBUG] Loaded {len(df)} rows from price_klines for {symbol} @ {interval}")
+    if DEBUG:
+        print(f"[DEBUG] Loaded {len(df)} rows from price_klines for {symbol} @ {interval}")
     return df
@@ -1,9 +1,52 @@
+import os
+
 import numpy as np
 import pandas as pd
+import torch
 import xgboost as xgb
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 
-from src.analytics.forecasting import load_price_data
+from src.analytics.price_cache import load_ohlcv_df
+
+
+def _rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing rolling sample std (ddof=1), NaN for the first window - 1 points,
+    from running sum / sum-of-squares (window sums are cumsum differences).
+    """
+    out = np.full(len(values), np.nan)
+    if window < 2 or len(values) < window:
+        return out
+
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    csum_sq = np.concatenate(([0.0], np.cumsum(values * values)))
+    s = csum[window:] - csum[:-window]
+    s_sq = csum_sq[window:] - csum_sq[:-window]
+
+    # Guard against tiny negatives from float cancellation
+    var = np.maximum((s_sq - s * s / window) / (window - 1), 0.0)
+    out[window - 1:] = np.sqrt(var)
+    return out
+
+
+def _vol_features(y: np.ndarray, window_short: int, window_long: int):
+    """
+    Log returns, short / long rolling volatility (daily) and their annualized
+    versions (sqrt(252)) from a close-price array, in one pass over the data.
+    """
+    # log returns (first one is 0)
+    ret = np.zeros(len(y))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret[1:] = np.log(y[1:] / y[:-1])
+    ret[np.isnan(ret)] = 0.0
+
+    # rolling volatility (daily)
+    vol_short = _rolling_std(ret, window_short)
+    vol_long = _rolling_std(ret, window_long)
+
+    # annualize volatility (sqrt(252))
+    ann_factor = np.sqrt(252)
+    return ret, vol_short, vol_long, vol_short * ann_factor, vol_long * ann_factor
 
 
 def compute_volatility_features(
@@ -21,20 +64,20 @@ def compute_volatility_features(
     Returns a DataFrame with columns:
       ds, y, ret, vol_short, vol_long
     """
-    df = load_price_data(symbol, period=period, interval="1d").copy()
+    prices = load_ohlcv_df(symbol, period=period, interval="1d")
 
-    # log returns
-    df["ret"] = np.log(df["y"] / df["y"].shift(1))
-    df["ret"] = df["ret"].fillna(0.0)
+    y = prices["y"].to_numpy(dtype=np.float64)
+    ret, vol_short, vol_long, vol_short_ann, vol_long_ann = _vol_features(y, window_short, window_long)
 
-    # rolling volatility (daily)
-    df["vol_short"] = df["ret"].rolling(window_short).std()
-    df["vol_long"] = df["ret"].rolling(window_long).std()
-
-    # annualize volatility (sqrt(252))
-    ann_factor = np.sqrt(252)
-    df["vol_short_ann"] = df["vol_short"] * ann_factor
-    df["vol_long_ann"] = df["vol_long"] * ann_factor
+    df = pd.DataFrame({
+        "ds": prices["ds"].to_numpy(),
+        "y": y,
+        "ret": ret,
+        "vol_short": vol_short,
+        "vol_long": vol_long,
+        "vol_short_ann": vol_short_ann,
+        "vol_long_ann": vol_long_ann,
+    })
 
     df = df.dropna().reset_index(drop=True)
     return df
@@ -70,15 +113,19 @@ def xgboost_vol_forecast(
     df: pd.DataFrame,
     horizon: int = 1,
     test_size: float = 0.2,
+    valid_size: float = 0.15,
 ):
     """
     Predict next-day realized volatility using XGBoost.
     Uses lagged volatility, lagged returns, etc. as features.
 
+    The last `valid_size` of the training window is held out for early
+    stopping (20 rounds without improvement).
+
     Returns:
       df_pred: DataFrame with ds, realized_vol_next, forecast_vol_xgb
       metrics: MAE, RMSE
-      model: trained XGBoost model
+      model: trained XGBoost Booster
     """
 
     df = df.copy()
@@ -109,19 +156,40 @@ def xgboost_vol_forecast(
     X_train, X_test = X[:split], X[split:]
     y_train, y_test = y[:split], y[split:]
 
-    # XGBoost model
-    model = xgb.XGBRegressor(
-        n_estimators=400,
-        learning_rate=0.03,
-        max_depth=4,
-        subsample=0.9,
-        colsample_bytree=0.9,
-        objective="reg:squarederror",
-    )
-
-    model.fit(X_train, y_train)
-
-    preds = model.predict(X_test)
+    # XGBoost model: histogram splits on pre-quantized data (QuantileDMatrix),
+    # so boosting rounds never re-sort features
+    params = {
+        "learning_rate": 0.03,
+        "max_depth": 4,
+        "subsample": 0.9,
+        "colsample_bytree": 0.9,
+        "objective": "reg:squarederror",
+        "tree_method": "hist",
+        "max_bin": 256,
+        "device": "cuda" if torch.cuda.is_available() else "cpu",
+        "nthread": os.cpu_count() or 1,
+    }
+
+    # Early stopping on the most recent slice of the training window
+    # (chronological, so no look-ahead into the test set)
+    n_valid = int(len(X_train) * valid_size)
+    if n_valid >= 10:
+        fit_end = len(X_train) - n_valid
+        dtrain = xgb.QuantileDMatrix(X_train[:fit_end], y_train[:fit_end], max_bin=params["max_bin"])
+        dvalid = xgb.QuantileDMatrix(X_train[fit_end:], y_train[fit_end:], ref=dtrain)
+        model = xgb.train(
+            params,
+            dtrain,
+            num_boost_round=400,
+            evals=[(dvalid, "valid")],
+            early_stopping_rounds=20,
+            verbose_eval=False,
+        )
+        preds = model.inplace_predict(X_test, iteration_range=(0, model.best_iteration + 1))
+    else:
+        dtrain = xgb.QuantileDMatrix(X_train, y_train, max_bin=params["max_bin"])
+        model = xgb.train(params, dtrain, num_boost_round=400)
+        preds = model.inplace_predict(X_test)
 
     mae = mean_absolute_error(y_test, preds)
     rmse = np.sqrt(mean_squared_error(y_test, preds))
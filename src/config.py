@@ -25,11 +25,26 @@ if not DATABASE_URL:
     else:
         DATABASE_URL = f"postgresql://{USER}:{PASS}@{HOST}/{NAME}"
 
+# Connection pooling: "queue" (default, long-running apps) or "null" to open a
+# fresh connection per use, for one-shot scripts / cron jobs
+DB_POOL = os.getenv("DB_POOL", "queue").lower()
+
 # --- App configuration ---
 
+# Set TRADING_LAB_DEBUG=1 to print debug output from data loaders
+DEBUG = os.getenv("TRADING_LAB_DEBUG", "").lower() in ("1", "true", "yes")
+
+# Set TRADING_LAB_NEURALPROPHET=1 to forecast with NeuralProphet instead of Prophet
+# (needs the optional `neuralprophet` package)
+USE_NEURALPROPHET = os.getenv("TRADING_LAB_NEURALPROPHET", "").lower() in ("1", "true", "yes")
+
 # Default symbols to play with
 DEFAULT_SYMBOLS = ["BTCUSDT", "ETHUSDT", "AAPL", "SPY"]
 
 # Binance base URL
 BINANCE_BASE_URL = "https://api.binance.com"
 
+# Binance WebSocket market streams (raw single stream / combined streams)
+BINANCE_WS_URL = "wss://stream.binance.com:9443/ws"
+BINANCE_WS_STREAM_URL = "wss://stream.binance.com:9443/stream"
+
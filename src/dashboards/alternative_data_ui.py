@@ -8,6 +8,24 @@ from src.analytics.alternative_data import (
      find_best_leading_lag,
     backtest_trend_signal,
 )
+from src.dashboards.charts import gl_line_chart
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_merge_trends(symbol: str, keyword: str, period: str, interval: str, timeframe: str, geo: str) -> pd.DataFrame:
+    return merge_trends_with_price(
+        symbol=symbol,
+        keyword=keyword,
+        period=period,
+        interval=interval,
+        timeframe=timeframe,
+        geo=geo,
+    )
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_lagged_correlations(df: pd.DataFrame, max_lag: int) -> pd.DataFrame:
+    return compute_lagged_correlations(df, max_lag=max_lag)
 
 
 def render_alt_data_section(symbol: str):
@@ -40,7 +58,7 @@ def render_alt_data_section(symbol: str):
         # Fetch + merge
         with st.spinner("Fetching price and Google Trends data..."):
             try:
-                df = merge_trends_with_price(
+                df = _cached_merge_trends(
                     symbol=symbol,
                     keyword=keyword,
                     period=period,
@@ -58,12 +76,12 @@ def render_alt_data_section(symbol: str):
         # 1) Time-series view
         st.markdown("### 📈 Price vs Google Trends Over Time")
 
-        fig_ts = px.line(
+        fig_ts = gl_line_chart(
             df,
             x="ds",
             y=["price", "trend"],
-            labels={"value": "Value", "variable": "Series"},
             title=f"{symbol} Price vs Google Trends: '{keyword}'",
+            y_title="Value",
         )
         st.plotly_chart(fig_ts, use_container_width=True)
 
@@ -83,7 +101,7 @@ def render_alt_data_section(symbol: str):
         # 3) Lagged correlations
         st.markdown("### ⏱ Lagged Correlations (Does Trends Lead Price?)")
 
-        corr_df = compute_lagged_correlations(df, max_lag=max_lag)
+        corr_df = _cached_lagged_correlations(df, max_lag=max_lag)
 
         fig_corr = px.bar(
             corr_df,
@@ -127,12 +145,12 @@ def render_alt_data_section(symbol: str):
             st.success("Backtest complete.")
 
             st.markdown("#### 📈 Equity Curve: Strategy vs Buy & Hold")
-            fig_eq = px.line(
+            fig_eq = gl_line_chart(
                 bt_df,
                 x="ds",
                 y=["equity_strategy", "equity_bh"],
-                labels={"value": "Equity", "variable": "Series"},
                 title="Trend-based Strategy vs Buy & Hold",
+                y_title="Equity",
             )
             st.plotly_chart(fig_eq, use_container_width=True)
 
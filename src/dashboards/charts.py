@@ -0,0 +1,30 @@
+import pandas as pd
+import plotly.graph_objects as go
+
+
+def gl_line_chart(
+    df: pd.DataFrame,
+    x: str,
+    y: list[str],
+    title: str,
+    x_title: str | None = None,
+    y_title: str | None = None,
+) -> go.Figure:
+    """
+    Multi-series line chart built in one go.Figure call with WebGL (Scattergl)
+    traces, so long series stay responsive on zoom / pan.
+
+    uirevision keeps the user's zoom across Streamlit reruns.
+    """
+    xs = df[x].to_numpy()
+    traces = [go.Scattergl(x=xs, y=df[col].to_numpy(), mode="lines", name=col) for col in y]
+
+    fig = go.Figure(data=traces)
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_title or x,
+        yaxis_title=y_title,
+        legend_title_text="Series",
+        uirevision="keep",
+    )
+    return fig
@@ -1,6 +1,10 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
 
 from src.analytics.forecasting import (
     load_price_data,
@@ -12,7 +16,41 @@ from src.analytics.forecasting import (
     train_prophet,
     evaluate_forecast,
     train_lstm_forecast,
+    prophet_forecast_job,
+    lstm_forecast_job,
+    train_neuralprophet,
 )
+from src.analytics.price_cache import load_ohlcv_df
+from src.config import USE_NEURALPROPHET
+
+# Two long-lived workers (one per model), reused across Streamlit reruns so
+# torch / prophet are imported once per worker rather than per click
+_executor: ProcessPoolExecutor | None = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: forking a process that may already hold CUDA / threads is unsafe
+        _executor = ProcessPoolExecutor(
+            max_workers=2,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def _drop_executor() -> None:
+    # A worker died (e.g. LSTM ran out of memory): the pool is unusable now,
+    # so the next run starts a fresh one
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_price_data(symbol: str, period: str) -> pd.DataFrame:
+    return load_ohlcv_df(symbol, period=period)
 
 
 def render_forecasting_section(symbol: str):
@@ -26,7 +64,8 @@ def render_forecasting_section(symbol: str):
         window_size = st.slider("LSTM Window Size (days)", 10, 90, 30)
         epochs = st.slider("LSTM Epochs", 10, 100, 40)
 
-        use_prophet = st.checkbox("Run Prophet", value=True)
+        prophet_label = "NeuralProphet" if USE_NEURALPROPHET else "Prophet"
+        use_prophet = st.checkbox(f"Run {prophet_label}", value=True)
         use_lstm = st.checkbox("Run LSTM (PyTorch)", value=True)
 
         run_button = st.button("Fetch & Forecast")
@@ -39,61 +78,84 @@ def render_forecasting_section(symbol: str):
         # 1) Load data
         with st.spinner("Fetching price data..."):
             try:
-                df = load_price_data(symbol, period=period)
+                df = _cached_price_data(symbol, period)
             except Exception as e:
                 st.error(str(e))
                 return
 
         st.success(f"Loaded {len(df)} data points.")
 
-        fig = px.line(title=f"{symbol} Price Forecast")
-        fig.add_scatter(x=df["ds"], y=df["y"], mode="lines", name="Actual Price")
+        # Collect every series, then build the figure once
+        traces = [go.Scattergl(x=df["ds"], y=df["y"], mode="lines", name="Actual Price")]
 
         metrics_table = {}
 
-        # 2) Prophet
+        # 2) Train. Prophet and LSTM are independent, so when both are selected
+        # they fit concurrently in separate processes. NeuralProphet stays
+        # in-process: its fit is cached here, so a horizon change only predicts.
+        with st.spinner("Training models..."):
+            parallel_done = False
+            if use_prophet and use_lstm and not USE_NEURALPROPHET:
+                try:
+                    executor = _get_executor()
+                    fut_p = executor.submit(prophet_forecast_job, df, horizon)
+                    fut_l = executor.submit(lstm_forecast_job, df, window_size, epochs, horizon)
+                    forecast_p = fut_p.result()
+                    in_sample_lstm, future_lstm, metrics_lstm = fut_l.result()
+                    parallel_done = True
+                except BrokenProcessPool:
+                    # Fall through to the in-process path below
+                    _drop_executor()
+                    st.warning("Worker process crashed; training in-process instead.")
+
+            if not parallel_done:
+                if use_prophet and USE_NEURALPROPHET:
+                    forecast_p, model_p = train_neuralprophet(df, periods=horizon)
+                elif use_prophet:
+                    forecast_p, model_p = train_prophet(df, periods=horizon)
+                if use_lstm:
+                    in_sample_lstm, future_lstm, metrics_lstm = train_lstm_forecast(
+                        df,
+                        window_size=window_size,
+                        epochs=epochs,
+                        forecast_horizon=horizon,
+                    )
+
+        # 3) Prophet
         if use_prophet:
-            with st.spinner("Training Prophet model..."):
-                forecast_p, model_p = train_prophet(df, periods=horizon)
-
             # Plot Prophet forecast
-            fig.add_scatter(
+            traces.append(go.Scattergl(
                 x=forecast_p["ds"],
                 y=forecast_p["yhat"],
                 mode="lines",
-                name="Prophet Forecast",
-            )
+                name=f"{prophet_label} Forecast",
+            ))
 
             # Evaluate Prophet
             metrics_p = evaluate_forecast(df, forecast_p)
-            metrics_table["Prophet"] = metrics_p
+            metrics_table[prophet_label] = metrics_p
 
-        # 3) LSTM
+        # 4) LSTM
         if use_lstm:
-            with st.spinner("Training LSTM model..."):
-                in_sample_lstm, future_lstm, metrics_lstm = train_lstm_forecast(
-                    df,
-                    window_size=window_size,
-                    epochs=epochs,
-                    forecast_horizon=horizon,
-                )
-
             # Combine in-sample + future for plotting
             full_lstm = pd.concat([in_sample_lstm, future_lstm], ignore_index=True)
 
-            fig.add_scatter(
+            traces.append(go.Scattergl(
                 x=full_lstm["ds"],
                 y=full_lstm["yhat_lstm"],
                 mode="lines",
                 name="LSTM Forecast",
-            )
+            ))
 
             metrics_table["LSTM"] = metrics_lstm
 
+        fig = go.Figure(data=traces)
+        fig.update_layout(title=f"{symbol} Price Forecast", uirevision="keep")
+
         st.markdown("### Forecast Visualization")
         st.plotly_chart(fig, use_container_width=True)
 
-        # 4) Metrics summary
+        # 5) Metrics summary
         if metrics_table:
             st.markdown("### Model Accuracy (on historical region)")
             for model_name, m in metrics_table.items():
@@ -8,6 +8,17 @@ from src.analytics.volatility import (
     naive_vol_forecast,
     xgboost_vol_forecast,
 )
+from src.dashboards.charts import gl_line_chart
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_volatility_features(symbol: str, period: str, window_short: int, window_long: int) -> pd.DataFrame:
+    return compute_volatility_features(
+        symbol=symbol,
+        period=period,
+        window_short=window_short,
+        window_long=window_long,
+    )
 
 def render_volatility_section(symbol: str):
     st.subheader(f"⚡ Volatility Lab — {symbol}")
@@ -29,7 +40,7 @@ def render_volatility_section(symbol: str):
         # --- Compute volatility features ---
         with st.spinner("Loading data and computing volatility..."):
             try:
-                df = compute_volatility_features(
+                df = _cached_volatility_features(
                     symbol=symbol,
                     period=period,
                     window_short=window_short,
@@ -47,23 +58,25 @@ def render_volatility_section(symbol: str):
 
         # 1) Price chart
         st.markdown("### 📈 Price")
-        fig_price = px.line(
+        fig_price = gl_line_chart(
             df,
             x="ds",
-            y="y",
+            y=["y"],
             title=f"{symbol} Price",
-            labels={"ds": "Date", "y": "Price"},
+            x_title="Date",
+            y_title="Price",
         )
         st.plotly_chart(fig_price, use_container_width=True)
 
         # 2) Volatility chart
         st.markdown("### ⚡ Rolling Volatility (Annualized)")
-        fig_vol = px.line(
+        fig_vol = gl_line_chart(
             df,
             x="ds",
             y=["vol_short_ann", "vol_long_ann"],
-            labels={"ds": "Date", "value": "Annualized Volatility", "variable": "Series"},
             title="Short vs Long Rolling Volatility",
+            x_title="Date",
+            y_title="Annualized Volatility",
         )
         st.plotly_chart(fig_vol, use_container_width=True)
 
@@ -86,12 +99,12 @@ def render_volatility_section(symbol: str):
 
         if not df_naive.empty:
             st.markdown("#### Naive: Predicted vs Realized Volatility Over Time")
-            fig_naive = px.line(
+            fig_naive = gl_line_chart(
                 df_naive,
                 x="ds",
                 y=["realized_vol_next", "forecast_vol"],
-                labels={"value": "Volatility", "variable": "Series"},
                 title="Naive Model: Realized vs Forecast Volatility",
+                y_title="Volatility",
             )
             st.plotly_chart(fig_naive, use_container_width=True)
 
@@ -107,12 +120,12 @@ def render_volatility_section(symbol: str):
             st.write(f"**RMSE (XGBoost):** {metrics_xgb['RMSE']:.6f}")
 
             st.markdown("### Forecast vs Realized Volatility (Test Set)")
-            fig_xgb = px.line(
+            fig_xgb = gl_line_chart(
                 df_xgb,
                 x="ds",
                 y=["realized_vol_next", "forecast_vol_xgb"],
-                labels={"value": "Volatility", "variable": "Series"},
                 title="XGBoost: Predicted vs Actual Volatility",
+                y_title="Volatility",
             )
             st.plotly_chart(fig_xgb, use_container_width=True)
                         # Combined comparison: Naive vs XGBoost vs Realized (on overlapping region)
@@ -126,12 +139,12 @@ def render_volatility_section(symbol: str):
             )
 
             if not merged.empty:
-                fig_combined = px.line(
+                fig_combined = gl_line_chart(
                     merged,
                     x="ds",
                     y=["realized_vol_next", "forecast_vol", "forecast_vol_xgb"],
-                    labels={"value": "Volatility", "variable": "Series"},
                     title="Realized vs Naive vs XGBoost Predicted Volatility",
+                    y_title="Volatility",
                 )
                 st.plotly_chart(fig_combined, use_container_width=True)
             else:
@@ -1,30 +1,181 @@
+import asyncio
+import queue
+import threading
+import httpx
+import orjson
 import requests
-from typing import Dict, Any, List
-from src.config import BINANCE_BASE_URL
+import websockets
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, List, Iterable, Tuple
+from urllib3.util.retry import Retry
+from src.config import BINANCE_BASE_URL, BINANCE_WS_STREAM_URL, BINANCE_WS_URL
+import numpy as np
 import pandas as pd
-from datetime import datetime, timezone
+import pyarrow as pa
+import pyarrow.compute as pc
 
-def get_order_book(symbol: str = "BTCUSDT", limit: int = 50) -> Dict[str, Any]:
+
+def _make_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=32,
+        # 5xx are retried briefly here; the last response is returned rather
+        # than raised, so callers see an HTTPError with its status. 429s are
+        # not retried here: callers back off (capped) on their Retry-After.
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=[502, 503, 504],
+            raise_on_status=False,
+        ),
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+# Shared keep-alive session: repeated calls reuse pooled TCP/TLS connections
+# to the Binance API instead of a new handshake per request.
+_session = _make_session()
+
+
+def get_order_book(
+    symbol: str = "BTCUSDT",
+    limit: int = 50,
+    session: requests.Session | None = None,
+) -> Dict[str, Any]:
     """
     Fetch order book snapshot from Binance.
     """
     url = f"{BINANCE_BASE_URL}/api/v3/depth"
     params = {"symbol": symbol, "limit": limit}
-    resp = requests.get(url, params=params, timeout=10)
+    resp = (session or _session).get(url, params=params, timeout=10)
     resp.raise_for_status()
     return resp.json()
 
 
-def get_klines(symbol: str = "BTCUSDT", interval: str = "1m", limit: int = 500) -> List[List[Any]]:
+def get_klines(
+    symbol: str = "BTCUSDT",
+    interval: str = "1m",
+    limit: int = 500,
+    session: requests.Session | None = None,
+) -> List[List[Any]]:
     """
     Fetch historical klines (candles) from Binance.
     """
     url = f"{BINANCE_BASE_URL}/api/v3/klines"
     params = {"symbol": symbol, "interval": interval, "limit": limit}
-    resp = requests.get(url, params=params, timeout=10)
+    resp = (session or _session).get(url, params=params, timeout=10)
     resp.raise_for_status()
     return resp.json()
 
+async def _aget_json(session: httpx.AsyncClient, url: str, params: Dict[str, Any]) -> Any:
+    resp = await session.get(url, params=params)
+    resp.raise_for_status()
+    return orjson.loads(resp.content)
+
+
+async def get_klines_async(
+    symbol: str = "BTCUSDT",
+    interval: str = "1m",
+    limit: int = 500,
+    session: httpx.AsyncClient | None = None,
+) -> List[List[Any]]:
+    """
+    Async version of get_klines, so many symbols can be fetched concurrently
+    on one httpx.AsyncClient with asyncio.gather.
+    """
+    url = f"{BINANCE_BASE_URL}/api/v3/klines"
+    params = {"symbol": symbol, "interval": interval, "limit": limit}
+    if session is not None:
+        return await _aget_json(session, url, params)
+    async with httpx.AsyncClient(timeout=10) as s:
+        return await _aget_json(s, url, params)
+
+
+async def get_order_book_async(
+    symbol: str = "BTCUSDT",
+    limit: int = 50,
+    session: httpx.AsyncClient | None = None,
+) -> Dict[str, Any]:
+    """
+    Async version of get_order_book.
+    """
+    url = f"{BINANCE_BASE_URL}/api/v3/depth"
+    params = {"symbol": symbol, "limit": limit}
+    if session is not None:
+        return await _aget_json(session, url, params)
+    async with httpx.AsyncClient(timeout=10) as s:
+        return await _aget_json(s, url, params)
+
+
+async def get_klines_many_async(
+    symbols: List[str],
+    interval: str = "1m",
+    limit: int = 500,
+) -> Dict[str, List[List[Any]] | Exception]:
+    """
+    Fetch klines for all symbols concurrently (wall time ~ slowest request
+    instead of the sum). A failed symbol maps to its exception.
+    """
+    limits = httpx.Limits(max_connections=50)
+    async with httpx.AsyncClient(timeout=10, limits=limits) as s:
+        results = await asyncio.gather(
+            *[get_klines_async(sym, interval, limit, session=s) for sym in symbols],
+            return_exceptions=True,
+        )
+    return dict(zip(symbols, results))
+
+
+def get_klines_many(
+    symbols: List[str],
+    interval: str = "1m",
+    limit: int = 500,
+) -> Dict[str, List[List[Any]] | Exception]:
+    """
+    Sync wrapper around get_klines_many_async for scripts and the ETL loop.
+    """
+    return asyncio.run(get_klines_many_async(symbols, interval, limit))
+
+
+# Fields of a Binance /klines row, in order. Rows carry a 12th field
+# ("ignore") which is never read.
+_KLINE_COLS = (
+    "open_time",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "close_time",
+    "quote_asset_volume",
+    "number_of_trades",
+    "taker_buy_base",
+    "taker_buy_quote",
+)
+_KLINE_INDEX = {name: i for i, name in enumerate(_KLINE_COLS)}
+
+
+# Fixed Arrow layout for klines (the ETL's carrier from Binance to Postgres)
+KLINES_ARROW_SCHEMA = pa.schema([
+    ("open_time", pa.timestamp("ms", tz="UTC")),
+    ("close_time", pa.timestamp("ms", tz="UTC")),
+    ("open", pa.float64()),
+    ("high", pa.float64()),
+    ("low", pa.float64()),
+    ("close", pa.float64()),
+    ("volume", pa.float64()),
+    ("quote_asset_volume", pa.float64()),
+    ("number_of_trades", pa.int32()),
+    ("taker_buy_base", pa.float64()),
+    ("taker_buy_quote", pa.float64()),
+])
+
+
+def _raw_klines(klines: list) -> np.ndarray:
+    return np.asarray(klines, dtype=object).reshape(-1, len(_KLINE_COLS) + 1)
+
+
 def klines_to_df(klines: list) -> pd.DataFrame:
     """
     Convert Binance /klines response to DataFrame with named columns.
@@ -32,62 +183,92 @@ def klines_to_df(klines: list) -> pd.DataFrame:
       [ open_time, open, high, low, close, volume, close_time,
         quote_asset_volume, number_of_trades,
         taker_buy_base, taker_buy_quote, ignore ]
+
+    Columns are built directly as typed arrays (ms timestamps viewed as
+    datetime64[ms, UTC], string -> float casts) rather than through an
+    object-dtype frame.
     """
-    cols = [
-        "open_time_ms",
-        "open",
-        "high",
-        "low",
-        "close",
-        "volume",
-        "close_time_ms",
-        "quote_asset_volume",
-        "number_of_trades",
-        "taker_buy_base",
-        "taker_buy_quote",
-        "ignore",
-    ]
-    df = pd.DataFrame(klines, columns=cols)
-
-    # Convert ms to UTC timestamps
-    df["open_time"] = df["open_time_ms"].apply(
-        lambda x: datetime.fromtimestamp(x / 1000.0, tz=timezone.utc)
-    )
-    df["close_time"] = df["close_time_ms"].apply(
-        lambda x: datetime.fromtimestamp(x / 1000.0, tz=timezone.utc)
-    )
+    raw = _raw_klines(klines)
+
+    def _col(name: str):
+        values = raw[:, _KLINE_INDEX[name]]
+        if name in ("open_time", "close_time"):
+            # Epoch ms is bit-compatible with datetime64[ms]: reinterpret, don't convert
+            return pd.DatetimeIndex(values.astype(np.int64).view("datetime64[ms]")).tz_localize("UTC")
+        if name == "number_of_trades":
+            return values.astype(np.int64)
+        return values.astype(np.float64)
+
+    # Same column order as KLINES_ARROW_SCHEMA / database.KLINE_COLUMNS
+    return pd.DataFrame({name: _col(name) for name in KLINES_ARROW_SCHEMA.names})
+
+
+def klines_to_arrow(klines: list) -> pa.Table:
+    """
+    Convert a Binance /klines response to a pyarrow.Table with
+    KLINES_ARROW_SCHEMA, one typed array per column (no pandas step).
+    The ms timestamps are wrapped as timestamp[ms, UTC] without conversion.
+
+    Price / volume strings are parsed by Arrow's native string -> float64
+    cast, so no Python float is created per value.
+    """
+    # Transpose rows -> columns (zip is a C loop); keep the shape when empty
+    cols = list(zip(*klines)) or [()] * (len(_KLINE_COLS) + 1)
 
-    # Cast numeric columns
-    num_cols = [
-        "open",
-        "high",
-        "low",
-        "close",
-        "volume",
-        "quote_asset_volume",
-        "taker_buy_base",
-        "taker_buy_quote",
-    ]
-    for c in num_cols:
-        df[c] = df[c].astype(float)
-
-    df["number_of_trades"] = df["number_of_trades"].astype(int)
-
-    return df[
-        [
-            "open_time",
-            "close_time",
-            "open",
-            "high",
-            "low",
-            "close",
-            "volume",
-            "quote_asset_volume",
-            "number_of_trades",
-            "taker_buy_base",
-            "taker_buy_quote",
-        ]
-    ]
+    arrays = []
+    for field in KLINES_ARROW_SCHEMA:
+        values = cols[_KLINE_INDEX[field.name]]
+        if pa.types.is_floating(field.type):
+            arrays.append(pc.cast(pa.array(values, type=pa.string()), field.type))
+        elif pa.types.is_timestamp(field.type):
+            arrays.append(pa.array(values, type=pa.int64()).cast(field.type))
+        else:
+            arrays.append(pa.array(values, type=field.type))
+
+    return pa.Table.from_arrays(arrays, schema=KLINES_ARROW_SCHEMA)
+
+
+def kline_stream_url(symbols: list[str], interval: str = "1m") -> str:
+    """
+    Combined-stream URL carrying <symbol>@kline_<interval> for every symbol
+    over one WebSocket connection.
+    """
+    streams = "/".join(f"{s.lower()}@kline_{interval}" for s in symbols)
+    return f"{BINANCE_WS_STREAM_URL}?streams={streams}"
+
+
+def parse_closed_kline(msg: str | bytes) -> Tuple[str, List[Any]] | None:
+    """
+    Parse one combined-stream kline message. Returns (symbol, row) once the
+    candle has closed, where row has the REST /klines layout (so it goes
+    through klines_to_arrow / klines_to_df unchanged); None for updates to a
+    still-open candle.
+    """
+    k = orjson.loads(msg)["data"]["k"]
+    if not k["x"]:
+        return None
+    return k["s"], [k["t"], k["o"], k["h"], k["l"], k["c"], k["v"], k["T"], k["q"], k["n"], k["V"], k["Q"], "0"]
+
+
+def order_book_to_df(bids: Iterable, asks: Iterable) -> pd.DataFrame:
+    """
+    Build the order book DataFrame from (price, qty) pairs (strings or numbers).
+    columns: ['side', 'price', 'volume'], side is categorical ('ask' / 'bid').
+    """
+    bids_arr = np.asarray(bids, dtype=np.float64).reshape(-1, 2)
+    asks_arr = np.asarray(asks, dtype=np.float64).reshape(-1, 2)
+
+    # codes index into categories: 0 = ask, 1 = bid
+    side_codes = np.concatenate([
+        np.ones(len(bids_arr), dtype=np.int8),
+        np.zeros(len(asks_arr), dtype=np.int8),
+    ])
+
+    return pd.DataFrame({
+        "side": pd.Categorical.from_codes(side_codes, categories=["ask", "bid"]),
+        "price": np.concatenate([bids_arr[:, 0], asks_arr[:, 0]]),
+        "volume": np.concatenate([bids_arr[:, 1], asks_arr[:, 1]]),
+    })
 
 
 def get_order_book_df(symbol: str = "BTCUSDT", limit: int = 100) -> pd.DataFrame:
@@ -96,14 +277,62 @@ def get_order_book_df(symbol: str = "BTCUSDT", limit: int = 100) -> pd.DataFrame
     columns: ['side', 'price', 'volume']
     """
     data = get_order_book(symbol, limit)
+    return order_book_to_df(data["bids"], data["asks"])
+
+
+# Depth of Binance's partial-depth stream (one of 5 / 10 / 20)
+ORDER_BOOK_STREAM_LEVELS = 20
+
+
+async def _stream_order_book(
+    url: str,
+    updates: queue.Queue,
+    stop: threading.Event,
+) -> None:
+    async with websockets.connect(url) as ws:
+        while not stop.is_set():
+            try:
+                msg = await asyncio.wait_for(ws.recv(), timeout=1.0)
+            except asyncio.TimeoutError:
+                continue
+
+            data = orjson.loads(msg)
+            book = {
+                "bids": {float(p): float(q) for p, q in data["bids"]},
+                "asks": {float(p): float(q) for p, q in data["asks"]},
+            }
+
+            # Readers only care about the latest book: drop the oldest if full
+            if updates.full():
+                try:
+                    updates.get_nowait()
+                except queue.Empty:
+                    pass
+            updates.put(book)
+
+
+def start_order_book_stream(
+    symbol: str = "BTCUSDT",
+    levels: int = ORDER_BOOK_STREAM_LEVELS,
+    speed_ms: int = 100,
+) -> Tuple[queue.Queue, threading.Event]:
+    """
+    Subscribe to Binance's partial-depth stream (<symbol>@depth<levels>@<speed_ms>ms)
+    in a background thread.
+
+    Each message is the current top-`levels` book; it is pushed onto the returned
+    queue as {"bids": {price: qty}, "asks": {price: qty}}. If the stream fails, the
+    exception is pushed instead. Set the returned event to close the stream.
+    """
+    url = f"{BINANCE_WS_URL}/{symbol.lower()}@depth{levels}@{speed_ms}ms"
+    updates: queue.Queue = queue.Queue(maxsize=100)
+    stop = threading.Event()
 
-    bids = [
-        {"side": "bid", "price": float(b[0]), "volume": float(b[1])}
-        for b in data["bids"]
-    ]
-    asks = [
-        {"side": "ask", "price": float(a[0]), "volume": float(a[1])}
-        for a in data["asks"]
-    ]
+    def _run():
+        try:
+            asyncio.run(_stream_order_book(url, updates, stop))
+        except Exception as e:
+            updates.put(e)
 
-    return pd.DataFrame(bids + asks)
+    threading.Thread(target=_run, name=f"orderbook-ws-{symbol}", daemon=True).start()
+    return updates, stop
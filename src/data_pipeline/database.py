@@ -1,24 +1,93 @@
+import atexit
+import io
+import logging
+import os
+import re
 import pandas as pd
-from datetime import datetime
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
-from src.config import DATABASE_URL
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from datetime import datetime, timezone
+from sqlalchemy import column, create_engine, make_url, table, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.pool import NullPool
+from src.config import DATABASE_URL, DB_POOL
+
+try:
+    # Optional: decodes the Postgres wire format straight into Arrow columns
+    import connectorx as cx
+except ImportError:
+    cx = None
+
+logger = logging.getLogger(__name__)
 
 _engine: Engine | None = None
+_engine_pid: int | None = None
 
 
 def get_engine() -> Engine:
-    global _engine
+    """
+    Process-wide engine: created once, then every caller shares its connection pool.
+
+    After a fork the child drops the inherited pool (without closing the
+    parent's connections) and opens its own. With DB_POOL=null (one-shot
+    scripts / cron) no idle connections are kept at all.
+    """
+    global _engine, _engine_pid
     if _engine is None:
-        _engine = create_engine(DATABASE_URL, future=True)
+        if DB_POOL == "null":
+            pool_kwargs = {"poolclass": NullPool}
+        else:
+            pool_kwargs = {
+                "pool_size": 10,
+                "max_overflow": 20,
+                "pool_pre_ping": True,
+                "pool_recycle": 1800,
+            }
+        _engine = create_engine(
+            DATABASE_URL,
+            future=True,
+            **pool_kwargs,
+            **_dialect_engine_kwargs(DATABASE_URL),
+        )
+        _engine_pid = os.getpid()
+        atexit.register(_dispose_engine)
+    elif _engine_pid != os.getpid():
+        _engine.dispose(close=False)
+        _engine_pid = os.getpid()
     return _engine
 
 
+def _dispose_engine() -> None:
+    # Only the process that owns the pool closes its connections
+    if _engine is not None and _engine_pid == os.getpid():
+        _engine.dispose()
+
+
+def _dialect_engine_kwargs(url: str) -> dict:
+    """
+    Postgres-only engine options: batched executemany on psycopg2 and a 30s
+    statement_timeout so a runaway dashboard query can't hold a connection.
+    """
+    db_url = make_url(url)
+    if db_url.get_backend_name() != "postgresql":
+        return {}
+
+    kwargs = {"connect_args": {"options": "-c statement_timeout=30000"}}
+    if db_url.get_driver_name() == "psycopg2":
+        kwargs.update(
+            executemany_mode="values_plus_batch",
+            insertmanyvalues_page_size=1000,
+            executemany_batch_page_size=500,
+        )
+    return kwargs
+
+
 def test_connection() -> None:
     engine = get_engine()
     with engine.connect() as conn:
         result = conn.execute(text("SELECT 1"))
-        print("DB connection OK, result:", list(result))
+        logger.info("DB connection OK, result: %s", list(result))
 
 
 def init_order_book_table() -> None:
@@ -39,34 +108,62 @@ def init_order_book_table() -> None:
     engine = get_engine()
     with engine.begin() as conn:
         conn.execute(text(ddl))
-    print("Ensured order_book_snapshots table exist")
+    logger.info("Ensured order_book_snapshots table exists.")
+
+
+_COPY_ORDER_BOOK_SQL = """
+    COPY order_book_snapshots (side, price, volume, symbol, snapshot_time)
+    FROM STDIN WITH (FORMAT text)
+"""
 
 
 def insert_order_book_snapshot(symbol: str, df: pd.DataFrame) -> None:
     """
     Insert a single snapshot (all price levels) into order_book_snapshots.
-    df must have columns: ['side', 'price', 'volume'].
+    df must have columns: ['side', 'price', 'volume']. An optional
+    'snapshot_time' column (tz-aware) is used as-is, so several buffered
+    snapshots can go in one call; otherwise all rows are stamped with now.
+
+    The levels are streamed with COPY ... FROM STDIN (tab-separated text),
+    which Postgres loads without parsing an INSERT per row. Drivers without
+    COPY support get multi-row INSERTs instead.
     """
     engine = get_engine()
 
-    snapshot_time = datetime.utcnow()
+    if "snapshot_time" in df.columns:
+        snapshot_time = df["snapshot_time"]
+    else:
+        snapshot_time = datetime.now(timezone.utc)
 
-    snapshot_df = df.copy()
-    snapshot_df["symbol"] = symbol
-    snapshot_df["snapshot_time"] = snapshot_time
+    if not _supports_copy():
+        df[["side", "price", "volume"]].assign(symbol=symbol, snapshot_time=snapshot_time).to_sql(
+            "order_book_snapshots",
+            engine,
+            if_exists="append",
+            index=False,
+            method="multi",
+            # 5 bind parameters per row; Postgres caps a statement at 65535
+            chunksize=min(max(len(df), 1), 65535 // 5),
+        )
+        logger.debug("Inserted order book rows for %s with %d levels.", symbol, len(df))
+        return
 
-    # Reorder columns to match table definition
-    snapshot_df = snapshot_df[["symbol", "snapshot_time", "side", "price", "volume"]]
+    buf = io.StringIO()
+    df[["side", "price", "volume"]].assign(
+        symbol=symbol,
+        snapshot_time=snapshot_time,
+    ).to_csv(buf, sep="\t", header=False, index=False)
+    buf.seek(0)
 
-    snapshot_df.to_sql(
-        "order_book_snapshots",
-        engine,
-        if_exists="append",
-        index=False,
-        method="multi",
-    )
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.copy_expert(_COPY_ORDER_BOOK_SQL, buf)
+        conn.commit()
+    finally:
+        conn.close()
 
-    print(f"Inserted snapshot for {symbol} at {snapshot_time} with {len(snapshot_df)} levels.")
+    logger.debug("Inserted order book rows for %s with %d levels.", symbol, len(df))
 
 def init_klines_table() -> None:
     """
@@ -92,51 +189,495 @@ def init_klines_table() -> None:
         UNIQUE (symbol, interval, open_time)
     );
     """
+    # Time-range scans: the UNIQUE (symbol, interval, open_time) index already
+    # serves "latest rows for a symbol" (scanned backwards for DESC); BRIN keeps
+    # pure open_time range filters cheap on the append-only table.
+    index_ddl = """
+    CREATE INDEX IF NOT EXISTS idx_price_klines_open_time_brin
+        ON price_klines USING BRIN (open_time) WITH (pages_per_range = 32);
+    """
     engine = get_engine()
     with engine.begin() as conn:
         conn.execute(text(ddl))
-    print("Ensured price_klines table exists.")
+        conn.execute(text(index_ddl))
+    logger.info("Ensured price_klines table exists.")
+
+    init_klines_aggregates()
+
+
+# Continuous aggregates over the 1m klines, keyed by the interval they serve
+KLINE_AGGREGATE_VIEWS = {
+    "5m": ("klines_5m", "5 minutes"),
+    "15m": ("klines_15m", "15 minutes"),
+    "1h": ("klines_1h", "1 hour"),
+}
+
+_KLINE_AGGREGATE_DDL = """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {view}
+    WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+    SELECT
+        symbol,
+        time_bucket(INTERVAL '{width}', open_time) AS bucket,
+        max(close_time) AS close_time,
+        first(open, open_time) AS open,
+        max(high) AS high,
+        min(low) AS low,
+        last(close, open_time) AS close,
+        sum(volume) AS volume,
+        sum(quote_asset_volume) AS quote_asset_volume,
+        sum(number_of_trades) AS number_of_trades,
+        sum(taker_buy_base) AS taker_buy_base,
+        sum(taker_buy_quote) AS taker_buy_quote
+    FROM price_klines
+    WHERE interval = '1m'
+    GROUP BY symbol, bucket
+    WITH NO DATA;
+"""
+
+# TimescaleDB needs open_time in every unique key, so the id primary key is
+# swapped for UNIQUE (id, open_time) before conversion; (symbol, interval,
+# open_time) stays the ON CONFLICT target. Run via migrate_klines_to_hypertable
+# only: migrate_data rewrites the whole table under an exclusive lock.
+_KLINES_HYPERTABLE_SQL = [
+    "SET LOCAL statement_timeout = 0",
+    "ALTER TABLE price_klines DROP CONSTRAINT IF EXISTS price_klines_pkey",
+    "ALTER TABLE price_klines ADD CONSTRAINT price_klines_id_open_time_key UNIQUE (id, open_time)",
+    "SELECT create_hypertable('price_klines', 'open_time', "
+    "chunk_time_interval => INTERVAL '1 day', migrate_data => TRUE)",
+]
+
+_KLINE_AGGREGATE_POLICY_SQL = """
+    SELECT add_continuous_aggregate_policy(
+        '{view}',
+        start_offset => INTERVAL '2 days',
+        end_offset => INTERVAL '{width}',
+        schedule_interval => INTERVAL '{width}',
+        if_not_exists => TRUE
+    );
+"""
+
+
+def _has_timescale_hypertable(engine: Engine) -> tuple[bool, bool]:
+    """(timescaledb installed, price_klines already a hypertable)"""
+    with engine.connect() as conn:
+        has_timescale = conn.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'timescaledb'")
+        ).first()
+        if not has_timescale:
+            return False, False
+        is_hypertable = conn.execute(
+            text(
+                "SELECT 1 FROM timescaledb_information.hypertables "
+                "WHERE hypertable_name = 'price_klines'"
+            )
+        ).first()
+    return True, is_hypertable is not None
+
+
+def migrate_klines_to_hypertable() -> bool:
+    """
+    One-off, explicit migration: convert price_klines into a TimescaleDB
+    hypertable (1-day chunks, existing rows moved in one transaction with no
+    statement_timeout), then create the continuous aggregates.
+
+    Locks price_klines for the duration; run it from the `migrate` ETL
+    subcommand during a quiet period, not from app startup.
+    Returns True when the aggregates are available.
+    """
+    engine = get_engine()
+    has_timescale, is_hypertable = _has_timescale_hypertable(engine)
+    if not has_timescale:
+        logger.warning("TimescaleDB is not installed; nothing to migrate.")
+        return False
+
+    if not is_hypertable:
+        try:
+            # One transaction: the key change is rolled back if conversion fails
+            with engine.begin() as conn:
+                for sql in _KLINES_HYPERTABLE_SQL:
+                    conn.execute(text(sql))
+        except Exception as e:
+            logger.warning("Could not convert price_klines to a hypertable: %s", e)
+            return False
+        logger.info("Converted price_klines to a hypertable.")
+
+    return init_klines_aggregates()
+
+
+def init_klines_aggregates() -> bool:
+    """
+    If price_klines is already a TimescaleDB hypertable, create the 5m / 15m /
+    1h continuous aggregates with refresh policies (idempotent). Never
+    converts the table itself: see migrate_klines_to_hypertable. No-op on
+    plain Postgres.
+
+    Returns True when the aggregates are available.
+    """
+    engine = get_engine()
+    has_timescale, is_hypertable = _has_timescale_hypertable(engine)
+    if not has_timescale:
+        return False
+    if not is_hypertable:
+        logger.info(
+            "price_klines is not a hypertable; run `python -m src.data_pipeline.etl_jobs migrate` "
+            "to enable the continuous aggregates."
+        )
+        return False
+
+    # Continuous aggregates can't be created inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for view, width in KLINE_AGGREGATE_VIEWS.values():
+            conn.execute(text(_KLINE_AGGREGATE_DDL.format(view=view, width=width)))
+            conn.execute(text(_KLINE_AGGREGATE_POLICY_SQL.format(view=view, width=width)))
+
+    global _kline_aggregates_found
+    _kline_aggregates_found = True
+    logger.info("Ensured price_klines hypertable and continuous aggregates exist.")
+    return True
+
+
+# Only a positive answer is remembered: the views are usually created by the
+# ETL process (or `migrate`) after a dashboard has already asked
+_kline_aggregates_found = False
+
+
+def _has_kline_aggregates() -> bool:
+    global _kline_aggregates_found
+    if not _kline_aggregates_found:
+        with get_engine().connect() as conn:
+            _kline_aggregates_found = bool(conn.execute(
+                text("SELECT to_regclass(:view) IS NOT NULL"),
+                {"view": KLINE_AGGREGATE_VIEWS["5m"][0]},
+            ).scalar())
+    return _kline_aggregates_found
+
+
+KLINE_COLUMNS = [
+    "open_time",
+    "close_time",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "quote_asset_volume",
+    "number_of_trades",
+    "taker_buy_base",
+    "taker_buy_quote",
+]
+
+# Klines are COPY'd into a per-connection staging table, then merged into
+# price_klines so duplicates are still skipped via ON CONFLICT
+_KLINES_STAGE_DDL = """
+    CREATE TEMP TABLE IF NOT EXISTS price_klines_stage (
+        symbol TEXT,
+        interval TEXT,
+        open_time TIMESTAMPTZ,
+        close_time TIMESTAMPTZ,
+        open NUMERIC,
+        high NUMERIC,
+        low NUMERIC,
+        close NUMERIC,
+        volume NUMERIC,
+        quote_asset_volume NUMERIC,
+        number_of_trades BIGINT,
+        taker_buy_base NUMERIC,
+        taker_buy_quote NUMERIC
+    ) ON COMMIT DELETE ROWS;
+"""
+
+_COPY_KLINES_STAGE_SQL = f"""
+    COPY price_klines_stage ({", ".join(KLINE_COLUMNS)}, symbol, interval)
+    FROM STDIN WITH (FORMAT csv)
+"""
+
+_MERGE_KLINES_STAGE_SQL = f"""
+    INSERT INTO price_klines (symbol, interval, {", ".join(KLINE_COLUMNS)})
+    SELECT symbol, interval, {", ".join(KLINE_COLUMNS)}
+    FROM price_klines_stage
+    ON CONFLICT (symbol, interval, open_time) DO NOTHING;
+"""
 
 
-def insert_klines(symbol: str, interval: str, df: pd.DataFrame) -> None:
+def insert_klines(
+    symbol: str,
+    interval: str,
+    df: pd.DataFrame,
+    conn: Connection | None = None,
+) -> None:
     """
     Insert a batch of klines into price_klines.
     df is expected to have columns:
       open_time, close_time, open, high, low, close, volume,
       quote_asset_volume, number_of_trades, taker_buy_base, taker_buy_quote
+
+    The batch is streamed as CSV with COPY ... FROM STDIN into a temp staging
+    table and merged with one INSERT ... SELECT ... ON CONFLICT DO NOTHING,
+    so the whole batch is a single round-trip with no per-row INSERT parsing.
+    Drivers without COPY support fall back to multi-row VALUES inserts.
+
+    Pass `conn` (an open SQLAlchemy connection) to run inside the caller's
+    transaction; otherwise a pooled connection is used and committed.
     """
     if df.empty:
-        print("No klines to insert.")
+        logger.debug("No klines to insert.")
         return
 
-    engine = get_engine()
+    if not _supports_copy():
+        records = df[KLINE_COLUMNS].assign(symbol=symbol, interval=interval).to_dict("records")
+        _insert_klines_multi_values(symbol, interval, records, conn=conn)
+        return
+
+    buf = io.StringIO()
+    df[KLINE_COLUMNS].assign(symbol=symbol, interval=interval).to_csv(buf, header=False, index=False)
+    buf.seek(0)
 
-    # Add symbol + interval columns
-    df = df.copy()
-    df["symbol"] = symbol
-    df["interval"] = interval
+    inserted = _copy_klines_csv(buf, conn=conn)
+    logger.debug(
+        "Inserted %d of %d klines (symbol=%s, interval=%s).", inserted, len(df), symbol, interval
+    )
 
-    # Convert to dicts for executemany
-    records = df.to_dict(orient="records")
 
-    sql = text("""
-        INSERT INTO price_klines (
-            symbol, interval, open_time, close_time,
-            open, high, low, close, volume,
-            quote_asset_volume, number_of_trades,
-            taker_buy_base, taker_buy_quote
-        )
-        VALUES (
-            :symbol, :interval, :open_time, :close_time,
-            :open, :high, :low, :close, :volume,
-            :quote_asset_volume, :number_of_trades,
-            :taker_buy_base, :taker_buy_quote
+def insert_klines_arrow(
+    symbol: str,
+    interval: str,
+    table: pa.Table,
+    conn: Connection | None = None,
+) -> None:
+    """
+    Same as insert_klines, for a pyarrow.Table with the KLINE_COLUMNS columns
+    (see binance_client.klines_to_arrow). Neither path goes through pandas:
+    the COPY payload is written by Arrow's CSV writer straight from the
+    columns, and the fallback builds its row dicts from the table directly.
+    """
+    if table.num_rows == 0:
+        logger.debug("No klines to insert.")
+        return
+
+    n = table.num_rows
+    staged = table.select(KLINE_COLUMNS).append_column(
+        "symbol", pa.repeat(pa.scalar(symbol), n)
+    ).append_column(
+        "interval", pa.repeat(pa.scalar(interval), n)
+    )
+
+    if not _supports_copy():
+        _insert_klines_multi_values(symbol, interval, staged.to_pylist(), conn=conn)
+        return
+
+    sink = io.BytesIO()
+    pa_csv.write_csv(staged, sink, write_options=pa_csv.WriteOptions(include_header=False))
+    sink.seek(0)
+
+    inserted = _copy_klines_csv(io.TextIOWrapper(sink, encoding="utf-8"), conn=conn)
+    logger.debug(
+        "Inserted %d of %d klines (symbol=%s, interval=%s).", inserted, n, symbol, interval
+    )
+
+
+def _copy_klines_csv(buf, conn: Connection | None = None) -> int:
+    """
+    COPY CSV rows (KLINE_COLUMNS..., symbol, interval) into the staging table
+    and merge them into price_klines. Returns the number of new rows.
+    """
+    if conn is not None:
+        # Caller's transaction: use its DBAPI connection, caller commits
+        return _copy_klines_stage(conn.connection.dbapi_connection, buf)
+
+    raw_conn = get_engine().raw_connection()
+    try:
+        inserted = _copy_klines_stage(raw_conn, buf)
+        raw_conn.commit()
+    finally:
+        raw_conn.close()
+    return inserted
+
+
+def _copy_klines_stage(dbapi_conn, buf) -> int:
+    with dbapi_conn.cursor() as cur:
+        cur.execute(_KLINES_STAGE_DDL)
+        cur.copy_expert(_COPY_KLINES_STAGE_SQL, buf)
+        cur.execute(_MERGE_KLINES_STAGE_SQL)
+        inserted = cur.rowcount
+        # ON COMMIT DELETE ROWS only fires at commit; clear now so a shared
+        # transaction can stage the next batch
+        cur.execute("TRUNCATE price_klines_stage;")
+    return inserted
+
+
+_price_klines = table(
+    "price_klines",
+    column("symbol"),
+    column("interval"),
+    *(column(col) for col in KLINE_COLUMNS),
+)
+
+
+def _supports_copy() -> bool:
+    # COPY FROM STDIN goes through psycopg2's cursor.copy_expert
+    return make_url(DATABASE_URL).get_driver_name() == "psycopg2"
+
+
+def _insert_klines_multi_values(
+    symbol: str,
+    interval: str,
+    records: list[dict],
+    chunksize: int = 500,
+    conn: Connection | None = None,
+) -> None:
+    """
+    Portable path for insert_klines: one INSERT ... VALUES (...), (...), ...
+    ON CONFLICT DO NOTHING per `chunksize` klines, on any Postgres driver.
+    records are row dicts with the KLINE_COLUMNS keys plus symbol / interval.
+    """
+
+    def _insert(c: Connection) -> int:
+        inserted = 0
+        for start in range(0, len(records), chunksize):
+            stmt = (
+                pg_insert(_price_klines)
+                .values(records[start:start + chunksize])
+                .on_conflict_do_nothing(index_elements=["symbol", "interval", "open_time"])
+            )
+            inserted += c.execute(stmt).rowcount
+        return inserted
+
+    if conn is not None:
+        inserted = _insert(conn)
+    else:
+        with get_engine().begin() as c:
+            inserted = _insert(c)
+
+    logger.debug(
+        "Inserted %d of %d klines (symbol=%s, interval=%s).", inserted, len(records), symbol, interval
+    )
+
+
+# NUMERIC columns are cast to double precision in SQL: charts don't need
+# Decimal precision, and it skips a per-value Decimal -> float conversion.
+_FETCH_KLINES_SQL = """
+    SELECT
+        open_time,
+        close_time,
+        CAST(open AS double precision) AS open,
+        CAST(high AS double precision) AS high,
+        CAST(low AS double precision) AS low,
+        CAST(close AS double precision) AS close,
+        CAST(volume AS double precision) AS volume,
+        CAST(quote_asset_volume AS double precision) AS quote_asset_volume,
+        number_of_trades,
+        CAST(taker_buy_base AS double precision) AS taker_buy_base,
+        CAST(taker_buy_quote AS double precision) AS taker_buy_quote
+    FROM price_klines
+    WHERE symbol = :symbol
+      AND interval = :interval
+      AND open_time > :since
+    ORDER BY open_time ASC
+"""
+
+# Same window aggregated into :bucket_seconds OHLCV candles
+_FETCH_KLINES_BUCKETED_SQL = """
+    SELECT
+        to_timestamp(floor(extract(epoch FROM open_time) / :bucket_seconds) * :bucket_seconds) AS open_time,
+        max(close_time) AS close_time,
+        CAST((array_agg(open ORDER BY open_time ASC))[1] AS double precision) AS open,
+        CAST(max(high) AS double precision) AS high,
+        CAST(min(low) AS double precision) AS low,
+        CAST((array_agg(close ORDER BY open_time DESC))[1] AS double precision) AS close,
+        CAST(sum(volume) AS double precision) AS volume,
+        CAST(sum(quote_asset_volume) AS double precision) AS quote_asset_volume,
+        CAST(sum(number_of_trades) AS bigint) AS number_of_trades,
+        CAST(sum(taker_buy_base) AS double precision) AS taker_buy_base,
+        CAST(sum(taker_buy_quote) AS double precision) AS taker_buy_quote
+    FROM price_klines
+    WHERE symbol = :symbol
+      AND interval = :interval
+      AND open_time > :since
+    GROUP BY 1
+    ORDER BY 1 ASC
+"""
+
+# Pre-aggregated candles from a continuous aggregate (same output columns)
+_FETCH_KLINES_AGGREGATE_SQL = """
+    SELECT
+        bucket AS open_time,
+        close_time,
+        CAST(open AS double precision) AS open,
+        CAST(high AS double precision) AS high,
+        CAST(low AS double precision) AS low,
+        CAST(close AS double precision) AS close,
+        CAST(volume AS double precision) AS volume,
+        CAST(quote_asset_volume AS double precision) AS quote_asset_volume,
+        CAST(number_of_trades AS bigint) AS number_of_trades,
+        CAST(taker_buy_base AS double precision) AS taker_buy_base,
+        CAST(taker_buy_quote AS double precision) AS taker_buy_quote
+    FROM {view}
+    WHERE symbol = :symbol
+      AND bucket > :since
+    ORDER BY bucket ASC
+"""
+
+_SAFE_IDENT = re.compile(r"^[A-Za-z0-9]+$")
+
+
+def _read_with_connectorx(sql: str, params: dict) -> pd.DataFrame:
+    # connectorx has no bind parameters: inline the (validated) values
+    literals = {}
+    for name, value in params.items():
+        if isinstance(value, str):
+            if not _SAFE_IDENT.match(value):
+                raise ValueError(f"Refusing to inline {name}={value!r}")
+            literals[name] = f"'{value}'"
+        elif isinstance(value, datetime):
+            literals[name] = f"'{value.isoformat()}'::timestamptz"
+        else:
+            literals[name] = str(int(value))
+
+    query = re.sub(r":(\w+)", lambda m: literals.get(m.group(1), m.group(0)), sql)
+    url = make_url(DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+    table = cx.read_sql(url, query, return_type="arrow")
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def _read_klines(sql: str, params: dict) -> pd.DataFrame:
+    if cx is not None:
+        return _read_with_connectorx(sql, params)
+
+    with get_engine().connect() as conn:
+        return pd.read_sql_query(
+            text(sql),
+            conn,
+            params=params,
+            parse_dates=["open_time", "close_time"],
+            dtype_backend="pyarrow",
         )
-        ON CONFLICT (symbol, interval, open_time) DO NOTHING;
-    """)
 
-    with engine.begin() as conn:
-        conn.execute(sql, records)
 
-    print(f"Inserted {len(records)} klines (symbol={symbol}, interval={interval}).")
+def fetch_klines_df(
+    symbol: str,
+    interval: str,
+    since: datetime,
+    bucket_seconds: int | None = None,
+) -> pd.DataFrame:
+    """
+    Klines for symbol/interval with open_time > since, oldest -> newest, as an
+    Arrow-backed DataFrame (prices as float64).
+
+    If bucket_seconds is given, rows are aggregated into OHLCV candles of that
+    width in Postgres before transfer. Otherwise stored rows of that interval
+    are returned; only when there are none (the ETL writes 1m by default)
+    are 5m / 15m / 1h candles read from the TimescaleDB continuous aggregate
+    built from the 1m rows, if it exists. Uses connectorx when installed,
+    else pd.read_sql_query on the shared engine.
+    """
+    params = {"symbol": symbol, "interval": interval, "since": since}
+    if bucket_seconds is not None:
+        params["bucket_seconds"] = int(bucket_seconds)
+        return _read_klines(_FETCH_KLINES_BUCKETED_SQL, params)
+
+    df = _read_klines(_FETCH_KLINES_SQL, params)
+    if df.empty and interval in KLINE_AGGREGATE_VIEWS and _has_kline_aggregates():
+        view = KLINE_AGGREGATE_VIEWS[interval][0]
+        return _read_klines(_FETCH_KLINES_AGGREGATE_SQL.format(view=view), params)
 
+    return df
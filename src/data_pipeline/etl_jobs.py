@@ -1,74 +1,280 @@
-from datetime import datetime
-import pandas as pd
-from sqlalchemy import text
-from src.data_pipeline.binance_client import get_klines, klines_to_df
-from src.data_pipeline.database import get_engine, init_klines_table, insert_klines
-from src.config import DEFAULT_SYMBOLS  # if you have this; otherwise hardcode list
-
+import argparse
+import asyncio
+import functools
+import logging
+import random
 import time
-from src.data_pipeline.binance_client import get_order_book_df
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+import httpx
+import pandas as pd
+import pyarrow as pa
+import psycopg2
+import pyarrow.parquet as pq
+import requests
+import websockets
+from sqlalchemy.exc import OperationalError
+from src.data_pipeline.binance_client import (
+    get_klines,
+    get_klines_async,
+    get_order_book_df,
+    klines_to_arrow,
+    klines_to_df,
+    kline_stream_url,
+    parse_closed_kline,
+)
+from src.config import DEBUG, DEFAULT_SYMBOLS  # if you have this; otherwise hardcode list
 from src.data_pipeline.database import (
     get_engine,
+    init_klines_table,
+    insert_klines_arrow,
+    migrate_klines_to_hypertable,
     test_connection,
     init_order_book_table,
     insert_order_book_snapshot,
 )
 
+logger = logging.getLogger(__name__)
+
+# Retry policy for transient Binance / Postgres failures: exponential backoff
+# with full jitter (0-1s, 0-2s, 0-4s, ... capped at RETRY_MAX_DELAY)
+RETRY_ATTEMPTS = 5
+RETRY_INITIAL_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+# Failures seen by the ETL, keyed by kind ("rate_limited", "server_error",
+# "network", "database", "other"), for monitoring / debugging
+FAILURES: Counter = Counter()
+
 
 def fetch_and_store_klines(symbol: str = "BTCUSDT", interval: str = "1m", limit: int = 500):
     """
-    Simple ETL: fetch klines from Binance and store them in a table.
-    For now, we'll just print them and later we wire to PostgreSQL.
+    Fetch one batch of klines from Binance and log a summary (row count and
+    time range) at INFO; the first rows too at DEBUG. Nothing is written to
+    the database: load_recent_klines_to_db is the variant that stores them.
     """
     raw = get_klines(symbol=symbol, interval=interval, limit=limit)
 
-    cols = [
-        "open_time", "open", "high", "low", "close", "volume",
-        "close_time", "quote_asset_volume", "num_trades",
-        "taker_buy_base", "taker_buy_quote", "ignore"
-    ]
-    df = pd.DataFrame(raw, columns=cols)
+    # Typed columns straight from the raw arrays (no object-dtype frame)
+    df = klines_to_df(raw)
+    if df.empty:
+        logger.info("No klines returned for %s @ %s.", symbol, interval)
+        return
+    logger.info(
+        "Fetched %d klines for %s @ %s, %s -> %s",
+        len(df), symbol, interval, df["open_time"].iloc[0], df["open_time"].iloc[-1],
+    )
+    # Formatting a frame isn't free: only do it when someone will see it
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("First klines for %s @ %s:\n%s", symbol, interval, df.head())
+
+
+# Table DDL checks run once per process; later calls are no-ops
+@functools.lru_cache(maxsize=None)
+def _ensure_order_book_table() -> None:
+    init_order_book_table()
 
-    # Convert timestamps
-    df["open_time"] = pd.to_datetime(df["open_time"], unit="ms")
-    df["close_time"] = pd.to_datetime(df["close_time"], unit="ms")
-    print(df.head())
 
-    # TODO: Create table + insert data into PostgreSQL
-    # engine = get_engine()
-    # df.to_sql("price_bars", engine, if_exists="append", index=False)
+@functools.lru_cache(maxsize=None)
+def _ensure_klines_table() -> None:
+    init_klines_table()
 
 
 def snapshot_order_book(symbol: str = "BTCUSDT", limit: int = 80) -> None:
     """
     Fetch one order book snapshot from Binance and store it in PostgreSQL.
     """
-    print("Testing DB connection...")
-    test_connection()
+    _ensure_order_book_table()
 
-    print("Ensuring table exists...")
-    init_order_book_table()
-
-    print(f"Fetching order book for {symbol}...")
+    logger.info("Fetching order book for %s...", symbol)
     df = get_order_book_df(symbol=symbol, limit=limit)
 
-    print("Inserting snapshot into database...")
+    logger.info("Inserting snapshot into database...")
     insert_order_book_snapshot(symbol, df)
 
-    print("Done.")
+    logger.info("Done.")
+
+
 
+# Lost / refused database connections. SQLAlchemy wraps driver errors in its
+# own OperationalError; the COPY path's raw psycopg2 cursor raises psycopg2's.
+_DB_ERRORS = (OperationalError, psycopg2.OperationalError, psycopg2.InterfaceError)
+
+
+def _failure_kind(exc: Exception) -> str:
+    if isinstance(exc, _DB_ERRORS):
+        return "database"
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status == 429:
+        return "rate_limited"
+    if status is not None and status >= 500:
+        return "server_error"
+    if isinstance(exc, requests.exceptions.RetryError):
+        # The session's own 5xx retries ran out
+        return "server_error"
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout, httpx.TransportError)):
+        return "network"
+    return "other"
+
+
+def _retry_delay(attempt: int, exc: Exception) -> float:
+    """
+    Seconds to wait before retry number `attempt` (0-based). A 429's
+    Retry-After header wins over the backoff schedule.
+    """
+    response = getattr(exc, "response", None)
+    if response is not None and response.status_code == 429:
+        try:
+            return min(float(response.headers["Retry-After"]), RETRY_MAX_DELAY)
+        except (KeyError, ValueError):
+            pass
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_INITIAL_DELAY * 2 ** attempt))
+
+
+def _is_retryable(exc: Exception) -> bool:
+    return _failure_kind(exc) in ("rate_limited", "server_error", "network", "database")
 
 
 def load_recent_klines_to_db(symbol: str = "BTCUSDT", interval: str = "1m", limit: int = 500):
     """
     Fetch recent klines from Binance and insert them into PostgreSQL.
     Idempotent: duplicates are skipped via ON CONFLICT.
+
+    Rate limits, 5xx responses, network errors and dropped DB connections are
+    retried with backoff (see RETRY_ATTEMPTS); anything else is raised.
+    """
+    _ensure_klines_table()
+
+    logger.info("Fetching %d recent klines for %s @ %s...", limit, symbol, interval)
+    for attempt in range(RETRY_ATTEMPTS):
+        try:
+            klines = get_klines(symbol=symbol, interval=interval, limit=limit)
+            insert_klines_arrow(symbol, interval, klines_to_arrow(klines))
+            break
+        except (requests.RequestException, *_DB_ERRORS) as e:
+            FAILURES[_failure_kind(e)] += 1
+            if attempt == RETRY_ATTEMPTS - 1 or not _is_retryable(e):
+                raise
+            delay = _retry_delay(attempt, e)
+            logger.warning("ETL for %s failed (%s), retrying in %.1fs...", symbol, e, delay)
+            time.sleep(delay)
+    logger.info("ETL batch complete.")
+
+
+def load_recent_klines_to_db_many(
+    symbols: list[str],
+    interval: str = "1m",
+    limit: int = 500,
+    max_workers: int = 8,
+) -> dict[str, bool]:
+    """
+    Run load_recent_klines_to_db for several symbols at once on a thread pool
+    (HTTP and psycopg2 release the GIL while waiting), for one-shot scripts
+    outside the async realtime loop. Returns {symbol: succeeded}.
     """
-    print(f"Fetching {limit} recent klines for {symbol} @ {interval}...")
-    klines = get_klines(symbol=symbol, interval=interval, limit=limit)
-    df = klines_to_df(klines)
-    insert_klines(symbol, interval, df)
-    print("ETL batch complete.")
+    _ensure_klines_table()
+
+    def _load(symbol: str) -> bool:
+        try:
+            load_recent_klines_to_db(symbol, interval, limit)
+            return True
+        except Exception as e:
+            logger.error("Failed ETL for %s: %s", symbol, e)
+            return False
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols)))) as pool:
+        return dict(zip(symbols, pool.map(_load, symbols)))
+
+
+async def _fetch_symbol(
+    session: httpx.AsyncClient, symbol: str, interval: str, limit: int
+) -> tuple[str, pa.Table | None]:
+    for attempt in range(RETRY_ATTEMPTS):
+        try:
+            klines = await get_klines_async(symbol, interval, limit, session=session)
+            return symbol, klines_to_arrow(klines)
+        except Exception as e:
+            FAILURES[_failure_kind(e)] += 1
+            if attempt == RETRY_ATTEMPTS - 1 or not _is_retryable(e):
+                logger.error("Failed to fetch klines for %s: %s", symbol, e)
+                return symbol, None
+            # Other symbols keep going while this one backs off
+            delay = _retry_delay(attempt, e)
+            logger.warning("Fetching klines for %s failed (%s), retrying in %.1fs...", symbol, e, delay)
+            await asyncio.sleep(delay)
+
+
+def _insert_tick(engine, interval: str, batches: list[tuple[str, pa.Table | None]]) -> bool:
+    """
+    Insert one tick's batches over a single connection, in one transaction.
+    Each symbol runs in a savepoint, so one bad batch doesn't roll back the rest.
+
+    Lost database connections retry the whole transaction with backoff (see
+    RETRY_ATTEMPTS). Returns False (after logging) if it still failed; nothing
+    was written and the caller retries on its next tick.
+    """
+    for attempt in range(RETRY_ATTEMPTS):
+        try:
+            with engine.begin() as conn:
+                for symbol, table in batches:
+                    if table is None:
+                        continue
+                    try:
+                        with conn.begin_nested():
+                            insert_klines_arrow(symbol, interval, table, conn=conn)
+                    except _DB_ERRORS:
+                        raise  # the connection is gone: redo the whole tick
+                    except Exception as e:
+                        FAILURES[_failure_kind(e)] += 1
+                        logger.error("Failed ETL for %s: %s", symbol, e)
+            return True
+        except Exception as e:
+            FAILURES[_failure_kind(e)] += 1
+            if attempt == RETRY_ATTEMPTS - 1 or not _is_retryable(e):
+                logger.error("Failed to write klines tick, retrying next tick: %s", e)
+                return False
+            delay = _retry_delay(attempt, e)
+            logger.warning("Writing klines tick failed (%s), retrying in %.1fs...", e, delay)
+            time.sleep(delay)
+    return False
+
+
+async def run_realtime_klines_etl_async(
+    symbols: list[str] | None = None,
+    interval: str = "1m",
+    limit: int = 500,
+    sleep_seconds: int = 60,
+):
+    """
+    Async realtime loop: every tick, fetch all symbols concurrently, then
+    insert them over one pooled connection in a single transaction.
+
+    Ticks are scheduled on fixed deadlines (start + k * sleep_seconds), so the
+    time spent fetching doesn't push the cadence back each cycle.
+    """
+    if symbols is None:
+        # fallback list if you don't want to use DEFAULT_SYMBOLS
+        symbols = ["BTCUSDT", "ETHUSDT"]
+
+    _ensure_klines_table()
+
+    logger.info("Starting realtime ETL loop for symbols=%s, interval=%s...", symbols, interval)
+    engine = get_engine()
+    loop = asyncio.get_running_loop()
+    limits = httpx.Limits(max_connections=50)
+    # One keep-alive client for the whole run
+    async with httpx.AsyncClient(timeout=10, limits=limits) as session:
+        next_tick = loop.time()
+        while True:
+            batches = await asyncio.gather(*(_fetch_symbol(session, sym, interval, limit) for sym in symbols))
+            # The insert is blocking psycopg2 I/O: run it off the event loop.
+            # A failed tick needs no carry-over: the next fetch of `limit`
+            # candles covers it again (duplicates are skipped).
+            await asyncio.to_thread(_insert_tick, engine, interval, batches)
+            next_tick += sleep_seconds
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
 
 
 def run_realtime_klines_etl(
@@ -81,44 +287,317 @@ def run_realtime_klines_etl(
     Simple realtime-ish loop:
       - every sleep_seconds, fetch recent klines for each symbol
       - write them to PostgreSQL
+    Blocking entry point for run_realtime_klines_etl_async.
+    """
+    asyncio.run(run_realtime_klines_etl_async(symbols, interval, limit, sleep_seconds))
+
+
+
+async def run_streaming_klines_etl_async(
+    symbols: list[str] | None = None,
+    interval: str = "1m",
+    backfill_limit: int = 500,
+):
+    """
+    Streaming realtime loop: subscribe to <symbol>@kline_<interval> for all
+    symbols on one WebSocket and insert each candle as it closes, instead of
+    re-polling `limit` candles over REST every tick.
+
+    REST is only used to backfill after each (re)connect; it runs once the
+    socket is open, so candles closing meanwhile are buffered, not missed.
+
+    Batches that fail to insert (database down) are kept and retried with
+    the next closed candle; malformed messages are logged and skipped.
     """
     if symbols is None:
-        # fallback list if you don't want to use DEFAULT_SYMBOLS
         symbols = ["BTCUSDT", "ETHUSDT"]
 
-    init_klines_table()
+    _ensure_klines_table()
+
+    logger.info("Starting streaming ETL for symbols=%s, interval=%s...", symbols, interval)
+    engine = get_engine()
+    url = kline_stream_url(symbols, interval)
+    attempt = 0
+    pending: list[tuple[str, pa.Table]] = []
 
-    print(f"Starting realtime ETL loop for symbols={symbols}, interval={interval}...")
-    while True:
-        for sym in symbols:
+    async def flush() -> None:
+        if await asyncio.to_thread(_insert_tick, engine, interval, pending):
+            pending.clear()
+
+    async with httpx.AsyncClient(timeout=10) as session:
+        while True:
             try:
-                load_recent_klines_to_db(symbol=sym, interval=interval, limit=limit)
+                async with websockets.connect(url) as ws:
+                    batches = await asyncio.gather(
+                        *(_fetch_symbol(session, sym, interval, backfill_limit) for sym in symbols)
+                    )
+                    # A fresh backfill covers anything still pending for that symbol
+                    fetched = [(sym, table) for sym, table in batches if table is not None]
+                    refreshed = {sym for sym, _ in fetched}
+                    pending[:] = [(sym, table) for sym, table in pending if sym not in refreshed] + fetched
+                    await flush()
+                    attempt = 0
+
+                    async for msg in ws:
+                        try:
+                            closed = parse_closed_kline(msg)
+                            if closed is None:
+                                continue
+                            symbol, row = closed
+                            table = klines_to_arrow([row])
+                        except (KeyError, TypeError, ValueError) as e:
+                            # Error frames / unexpected payloads: not a candle
+                            FAILURES["other"] += 1
+                            logger.warning("Skipping unexpected kline stream message (%r): %.200s", e, msg)
+                            continue
+
+                        logger.debug("Closed %s candle for %s", interval, symbol)
+                        pending.append((symbol, table))
+                        await flush()
+            except (websockets.WebSocketException, OSError) as e:
+                FAILURES["network"] += 1
+                delay = _retry_delay(min(attempt, 5), e)
+                attempt += 1
+                logger.warning("Kline stream dropped (%s), reconnecting in %.1fs...", e, delay)
+                await asyncio.sleep(delay)
             except Exception as e:
-                print(f"[ERROR] Failed ETL for {sym}: {e}")
-        print(f"Sleeping {sleep_seconds} seconds...\n")
-        time.sleep(sleep_seconds)
+                FAILURES["other"] += 1
+                delay = _retry_delay(min(attempt, 5), e)
+                attempt += 1
+                logger.exception("Kline stream failed unexpectedly, reconnecting in %.1fs...", delay)
+                await asyncio.sleep(delay)
+
 
+def run_streaming_klines_etl(
+    symbols: list[str] | None = None,
+    interval: str = "1m",
+    backfill_limit: int = 500,
+):
+    """
+    Blocking entry point for run_streaming_klines_etl_async.
+    """
+    asyncio.run(run_streaming_klines_etl_async(symbols, interval, backfill_limit))
 
 
-def snapshot_order_book_loop(symbol: str = "BTCUSDT", limit: int = 80, interval_seconds: int = 5, cycles: int = 60):
+def _sleep_until(deadline: float, interval_seconds: float) -> float:
     """
-    Take repeated snapshots every `interval_seconds` seconds.
+    Sleep until `deadline` (a time.monotonic() value) and return the next one.
+    If the cycle overran, the missed ticks are skipped rather than run
+    back-to-back, so snapshots stay on the original grid.
+    """
+    now = time.monotonic()
+    if now > deadline:
+        missed = int((now - deadline) // interval_seconds) + 1
+        logger.warning("Snapshot cycle overran by %.2fs, skipping %d tick(s).", now - deadline, missed)
+        deadline += missed * interval_seconds
+    time.sleep(deadline - now)
+    return deadline + interval_seconds
+
+
+def snapshot_order_book_loop(
+    symbol: str = "BTCUSDT",
+    limit: int = 80,
+    interval_seconds: int = 5,
+    cycles: int = 60,
+    flush_every: int = 10,
+):
+    """
+    Take repeated snapshots every `interval_seconds` seconds, on fixed
+    deadlines so fetch/insert time doesn't accumulate as drift.
+    Fetches go through binance_client's pooled session, so every cycle after
+    the first reuses the same keep-alive connection.
+
+    Snapshots are buffered and written `flush_every` at a time in one COPY
+    (each keeps its own snapshot_time); whatever is left is flushed on exit,
+    including Ctrl-C / exceptions.
     """
     test_connection()
-    init_order_book_table()
+    _ensure_order_book_table()
+
+    buf: list[pd.DataFrame] = []
+
+    def flush() -> None:
+        if buf:
+            insert_order_book_snapshot(symbol, pd.concat(buf, ignore_index=True))
+            buf.clear()
+
+    deadline = time.monotonic() + interval_seconds
+    try:
+        for i in range(cycles):
+            logger.debug("[%d/%d] Fetching snapshot for %s...", i + 1, cycles, symbol)
+            df = get_order_book_df(symbol=symbol, limit=limit)
+            buf.append(df.assign(snapshot_time=datetime.now(timezone.utc)))
+            if len(buf) >= flush_every:
+                flush()
+            deadline = _sleep_until(deadline, interval_seconds)
+    finally:
+        flush()
+
+
+ORDER_BOOK_PARQUET_SCHEMA = pa.schema([
+    ("snapshot_time", pa.timestamp("us", tz="UTC")),
+    ("side", pa.dictionary(pa.int8(), pa.string())),
+    ("price", pa.float64()),
+    ("volume", pa.float64()),
+])
+
+
+def snapshot_order_book_loop_parquet(
+    symbol: str = "BTCUSDT",
+    limit: int = 80,
+    interval_seconds: int = 5,
+    cycles: int = 60,
+    root: str | Path = "data",
+):
+    """
+    Same as snapshot_order_book_loop, but appends each snapshot as a row group
+    to hourly Parquet files (snappy) instead of inserting rows into Postgres:
+
+      <root>/orderbook/symbol=<symbol>/date=<YYYY-MM-DD>/part-<HH>-<unix ts>.parquet
+    """
+    writer: pq.ParquetWriter | None = None
+    writer_hour = None
+    deadline = time.monotonic() + interval_seconds
+
+    try:
+        for i in range(cycles):
+            logger.debug("[%d/%d] Fetching snapshot for %s...", i + 1, cycles, symbol)
+            df = get_order_book_df(symbol=symbol, limit=limit)
+            snapshot_time = datetime.now(timezone.utc)
+
+            # Rotate to a new file when the hour changes
+            hour = snapshot_time.replace(minute=0, second=0, microsecond=0)
+            if hour != writer_hour:
+                if writer is not None:
+                    writer.close()
+                part_dir = Path(root) / "orderbook" / f"symbol={symbol}" / f"date={hour:%Y-%m-%d}"
+                part_dir.mkdir(parents=True, exist_ok=True)
+                path = part_dir / f"part-{hour:%H}-{int(snapshot_time.timestamp())}.parquet"
+                writer = pq.ParquetWriter(path, ORDER_BOOK_PARQUET_SCHEMA, compression="snappy")
+                writer_hour = hour
+
+            table = pa.Table.from_pandas(
+                df[["side", "price", "volume"]].assign(snapshot_time=snapshot_time),
+                schema=ORDER_BOOK_PARQUET_SCHEMA,
+                preserve_index=False,
+            )
+            writer.write_table(table)
+            deadline = _sleep_until(deadline, interval_seconds)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _cmd_klines_once(args: argparse.Namespace) -> None:
+    fetch_and_store_klines(symbol=args.symbol, interval=args.interval, limit=args.limit)
+
+
+def _cmd_backfill(args: argparse.Namespace) -> None:
+    results = load_recent_klines_to_db_many(args.symbols, interval=args.interval, limit=args.limit)
+    failed = [sym for sym, ok in results.items() if not ok]
+    if failed:
+        raise SystemExit(f"Backfill failed for: {', '.join(failed)}")
+
+
+def _cmd_migrate(args: argparse.Namespace) -> None:
+    _ensure_klines_table()
+    if not migrate_klines_to_hypertable():
+        raise SystemExit("price_klines was not migrated (see log)")
+
+
+def _cmd_orderbook_loop(args: argparse.Namespace) -> None:
+    if args.parquet_root:
+        snapshot_order_book_loop_parquet(
+            symbol=args.symbol,
+            limit=args.limit,
+            interval_seconds=args.interval_seconds,
+            cycles=args.cycles,
+            root=args.parquet_root,
+        )
+    else:
+        snapshot_order_book_loop(
+            symbol=args.symbol,
+            limit=args.limit,
+            interval_seconds=args.interval_seconds,
+            cycles=args.cycles,
+        )
+
+
+def _cmd_stream(args: argparse.Namespace) -> None:
+    run_streaming_klines_etl(symbols=args.symbols, interval=args.interval, backfill_limit=args.limit)
+
+
+def _cmd_realtime(args: argparse.Namespace) -> None:
+    run_realtime_klines_etl(
+        symbols=args.symbols,
+        interval=args.interval,
+        limit=args.limit,
+        sleep_seconds=args.interval_seconds,
+    )
+
+
+# Used by `stream` and, with no subcommand, by the Docker / Render workers
+_STREAM_DEFAULTS = {"symbols": ["BTCUSDT", "ETHUSDT"], "interval": "1m", "limit": 500}
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Command-line entry point. With no subcommand, runs the streaming klines
+    ETL (what the Docker / Render workers start).
+    """
+    parser = argparse.ArgumentParser(prog="python -m src.data_pipeline.etl_jobs")
+    parser.set_defaults(func=_cmd_stream, **_STREAM_DEFAULTS)
+    sub = parser.add_subparsers(title="commands", required=False)
+
+    klines_once = sub.add_parser("klines-once", help="fetch one batch of klines and log a summary (no DB write)")
+    klines_once.set_defaults(func=_cmd_klines_once)
+    klines_once.add_argument("--symbol", default="BTCUSDT")
+    klines_once.add_argument("--interval", default="1m")
+    klines_once.add_argument("--limit", type=int, default=500)
+
+    backfill = sub.add_parser(
+        "backfill", help="fetch recent klines for several symbols concurrently and store them in Postgres"
+    )
+    backfill.set_defaults(func=_cmd_backfill)
+    backfill.add_argument("--symbols", nargs="+", default=["BTCUSDT", "ETHUSDT"])
+    backfill.add_argument("--interval", default="1m")
+    backfill.add_argument("--limit", type=int, default=500)
+
+    migrate = sub.add_parser(
+        "migrate", help="convert price_klines to a TimescaleDB hypertable (locks the table; run once)"
+    )
+    migrate.set_defaults(func=_cmd_migrate)
+
+    orderbook = sub.add_parser("orderbook-loop", help="take repeated order book snapshots")
+    orderbook.set_defaults(func=_cmd_orderbook_loop)
+    orderbook.add_argument("--symbol", default="BTCUSDT")
+    orderbook.add_argument("--limit", type=int, default=80)
+    orderbook.add_argument("--interval-seconds", type=int, default=5)
+    orderbook.add_argument("--cycles", type=int, default=20)
+    orderbook.add_argument("--parquet-root", help="write Parquet files under this directory instead of Postgres")
+
+    stream = sub.add_parser("stream", help="stream closed klines over WebSocket into Postgres (default)")
+    stream.set_defaults(func=_cmd_stream)
+    stream.add_argument("--symbols", nargs="+", default=_STREAM_DEFAULTS["symbols"])
+    stream.add_argument("--interval", default=_STREAM_DEFAULTS["interval"])
+    stream.add_argument("--limit", type=int, default=_STREAM_DEFAULTS["limit"], help="REST backfill size on (re)connect")
+
+    realtime = sub.add_parser("realtime", help="poll recent klines over REST every interval-seconds")
+    realtime.set_defaults(func=_cmd_realtime)
+    realtime.add_argument("--symbols", nargs="+", default=["BTCUSDT", "ETHUSDT"])
+    realtime.add_argument("--interval", default="1m")
+    realtime.add_argument("--limit", type=int, default=500)
+    realtime.add_argument("--interval-seconds", type=int, default=60)
+
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.DEBUG if DEBUG else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
 
-    for i in range(cycles):
-        print(f"[{i+1}/{cycles}] Fetching snapshot for {symbol}...")
-        df = get_order_book_df(symbol=symbol, limit=limit)
-        insert_order_book_snapshot(symbol, df)
-        time.sleep(interval_seconds)
+    args.func(args)
 
 
 if __name__ == "__main__":
-    fetch_and_store_klines()
-    
-    # For now, just snapshot BTCUSDT once
-    #snapshot_order_book(symbol="BTCUSDT", limit=80)
-    snapshot_order_book_loop(symbol="BTCUSDT", limit=80, interval_seconds=5, cycles=20)
-    # Example: run realtime ETL for BTC and ETH on 1-minute candles
-    run_realtime_klines_etl(symbols=["BTCUSDT", "ETHUSDT"], interval="1m", limit=500, sleep_seconds=60)
+    main()